@@ -2,6 +2,10 @@ import os
 import re
 import json
 import csv
+import time
+import traceback
+from collections import ChainMap
+from functools import lru_cache
 import pandas as pd
 import numpy as np
 import xgboost as xgb
@@ -9,34 +13,107 @@ import joblib
 from datetime import datetime
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage
-from langchain_core.prompts import PromptTemplate
+from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
+from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import BaseModel, Field, ValidationError
 
 # Import our new modules
 from milvus_utils import get_milvus_store
 from conversation_intelligence import get_conversation_intelligence, IntentType
+from tenant_screening import screen_tenant
 
 load_dotenv()
 
 # Set OpenAI API key
 openai_api_key = os.getenv("OPENAI_API_KEY")
 
+# Exact replies treated as the user confirming the summarised details
+_CONFIRM_SET = frozenset({"yes", "correct", "that's right", "yep", "confirmed", "go ahead", "proceed"})
+
+# Phrases that mark an assistant message as asking the user to confirm details
+_CONFIRM_KW_RE = re.compile(
+    "|".join(re.escape(kw) for kw in (
+        "please confirm", "is this information correct", "is this correct",
+        "can you confirm", "are these details correct"
+    )),
+    re.IGNORECASE
+)
+
+# LLM filler/advice stripped from tenant screening replies, as written or capitalized (case-sensitive)
+_ADVICE_PHRASES = (
+    "please wait", "processing", "hold on", "one moment", "I'll process", "wait a moment",
+    "it's important to exercise caution", "you may wish to consider", "you may want to explore",
+    "consider requesting a guarantor", "By considering these factors", "Tips for Landlord",
+    "Based on the information provided", "Summary:"
+)
+_ADVICE_RE = re.compile(
+    "|".join(re.escape(form) for form in dict.fromkeys(
+        form for phrase in _ADVICE_PHRASES for form in (phrase, phrase.capitalize())
+    ))
+)
+
+# Reply lines mentioning fields tenant screening does not collect
+_EXTRA_FIELD_LINE_RE = re.compile(
+    "|".join(re.escape(field) for field in (
+        "full name", "rental history", "name:", "history:", "annual income", "tenant's name"
+    )),
+    re.IGNORECASE
+)
+
+@lru_cache(maxsize=8)
+def get_chat(model="gpt-4", temperature=0.7):
+    """Shared chat client per model/temperature, so its HTTP connection pool is reused across calls."""
+    return ChatOpenAI(model=model, temperature=temperature, openai_api_key=openai_api_key)
+
+# --- LangChain Message Conversion ---
+
+_LC_MESSAGE_TYPES = {"system": SystemMessage, "user": HumanMessage, "assistant": AIMessage}
+
+def _lc_message(role, content):
+    return _LC_MESSAGE_TYPES.get(role, HumanMessage)(content=content)
+
+def to_langchain_messages(system_prompt, conversation_history, user_message):
+    """
+    Convert a {role, content} conversation into LangChain messages with the
+    correct System/Human/AI types, led by the handler's system prompt.
+    """
+    return [
+        _lc_message("system", system_prompt),
+        *(_lc_message(m["role"], m["content"]) for m in conversation_history),
+        _lc_message("user", user_message),
+    ]
+
+def find_last_assistant_content(conversation_history):
+    """
+    Return the content of the most recent assistant turn, or None.
+    Callers that track this incrementally (e.g. the websocket session) should pass it directly instead.
+    """
+    for m in reversed(conversation_history or []):
+        if m["role"] == "assistant":
+            return m["content"]
+    return None
+
 # --- Modular Conversational Engine ---
 
 class BaseModuleHandler:
     """
     Base class for all module handlers (rent, tenant, maintenance).
     """
+    _FIELD_SYNONYM_FLAT = frozenset()
     def extract_fields(self, user_message, conversation_history, last_candidate_fields=None):
         raise NotImplementedError
     def summarize_fields(self, fields):
         raise NotImplementedError
     def needs_confirmation(self, user_message):
         # Only treat as confirmation if the user is confirming the information, not to trigger the model
-        confirmation_phrases = ["yes", "correct", "that's right", "yep", "confirmed", "go ahead", "proceed"]
-        return user_message.strip().lower() in confirmation_phrases
+        return user_message.strip().lower() in _CONFIRM_SET
     def run_model(self, fields):
         raise NotImplementedError
+    def reply_mentions_fields(self, reply):
+        # Cheap pre-check before re-extracting fields from an LLM reply: digits or a field synonym must appear
+        reply_lower = reply.lower()
+        return any(ch.isdigit() for ch in reply_lower) or any(syn in reply_lower for syn in self._FIELD_SYNONYM_FLAT)
     def format_result(self, result):
         raise NotImplementedError
 
@@ -59,7 +136,6 @@ class RentPredictionHandler(BaseModuleHandler):
     @classmethod
     def get_model(cls):
         if cls._model is None:
-            import xgboost as xgb
             cls._model = xgb.Booster()
             cls._model.load_model(cls._model_path)
         return cls._model
@@ -83,17 +159,13 @@ class RentPredictionHandler(BaseModuleHandler):
             "Always keep the conversation natural and helpful. "
             "Respond in markdown."
         )
-        self.chat = ChatOpenAI(model="gpt-4", temperature=0.7, openai_api_key=openai_api_key)
+        self.chat = get_chat("gpt-4", 0.7)
 
     def extract_fields(self, user_message, conversation_history, last_candidate_fields=None):
         # Use LangChain's PydanticOutputParser for robust extraction
-        from langchain.output_parsers import PydanticOutputParser
-        from pydantic import BaseModel, Field, ValidationError
-        from langchain_core.prompts import ChatPromptTemplate
-        import re
         # Only attempt extraction if the intent is rent prediction
         if detect_intent(user_message, conversation_history) != "rent_prediction":
-            return last_candidate_fields or {}
+            return dict(last_candidate_fields) if last_candidate_fields else {}
         class RentFields(BaseModel):
             address: str = Field(..., description="The property address or location")
             subdistrict_code: str = Field(..., description="The subdistrict code or postcode")
@@ -117,7 +189,7 @@ class RentPredictionHandler(BaseModuleHandler):
             user_message=user_message,
             format_instructions=format_instructions
         )
-        response = self.chat.invoke([HumanMessage(content=prompt_value.to_string())])
+        response = self.chat.invoke(prompt_value.to_messages())
         content = response.content.strip()
         try:
             parsed = parser.parse(content)
@@ -169,18 +241,17 @@ class RentPredictionHandler(BaseModuleHandler):
 
     def summarize_fields(self, fields):
         # Summarize in markdown with a professional heading
-        summary = "**Property Information for Rent Estimation:**\n\n"
-        for k, v in fields.items():
-            summary += f"- **{k}**: {v}\n"
-        summary += "\nIs this information correct? Please confirm to proceed with the rent estimation."
-        return summary
+        field_lines = "".join(f"- **{k}**: {v}\n" for k, v in fields.items())
+        return (
+            "**Property Information for Rent Estimation:**\n\n"
+            f"{field_lines}"
+            "\nIs this information correct? Please confirm to proceed with the rent estimation."
+        )
 
     def encode_fields_for_model(self, fields):
         """
         Map user-friendly fields to encoded values using the mapping files.
         """
-        import json
-        import os
         # Load mapping files (cache for performance if needed)
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../Rent_Pricing_AI'))
         with open(os.path.join(base_dir, 'address_map.json'), 'r', encoding='utf-8') as f:
@@ -211,9 +282,6 @@ class RentPredictionHandler(BaseModuleHandler):
         return encoded
 
     def run_model(self, fields):
-        import xgboost as xgb
-        import csv
-        import os
         print("[DEBUG] User fields (extracted from conversation):", fields)
         encoded_fields = self.encode_fields_for_model(fields)
         print("[DEBUG] Encoded fields for model:", encoded_fields)
@@ -223,8 +291,6 @@ class RentPredictionHandler(BaseModuleHandler):
         ]
         model_input = {k: encoded_fields[k] for k in MODEL_FIELDS if k in encoded_fields}
         model = self.get_model()
-        import pandas as pd
-        import numpy as np
         dinput = xgb.DMatrix(pd.DataFrame([model_input]), missing=np.nan)
         predicted_log_rent = model.predict(dinput)
         predicted_rent = np.expm1(predicted_log_rent)
@@ -266,9 +332,7 @@ class RentPredictionHandler(BaseModuleHandler):
         """
         if not last_prediction:
             return "No property prediction found to process this action. Please estimate rent first."
-        import os, csv, pandas as pd, json, re
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../Rent_Pricing_AI'))
-        import json
         with open(os.path.join(base_dir, 'property_type_map.json'), 'r', encoding='utf-8') as f:
             property_type_map = json.load(f)
         # Invert property_type_map for code-to-label lookup
@@ -350,7 +414,8 @@ class RentPredictionHandler(BaseModuleHandler):
                         # Compose a brief summary using LLM
                         similar_listings = []
                         rents = []
-                        for _, row in faiss_results.iterrows() if hasattr(faiss_results, 'iterrows') else [(None, faiss_results)]:
+                        records = faiss_results.to_dict('records') if hasattr(faiss_results, 'to_dict') else [faiss_results]
+                        for row in records:
                             addr_code = row.get('address','')
                             addr_str = inv_address_map.get(addr_code)
                             if addr_str is None:
@@ -381,7 +446,7 @@ class RentPredictionHandler(BaseModuleHandler):
                                 pass
                         user_rent = float(pred.get('predicted_rent', 0))
                         # LLM summary
-                        llm = ChatOpenAI(model="gpt-4", temperature=0.3, openai_api_key=openai_api_key)
+                        llm = get_chat("gpt-4", 0.3)
                         summary_prompt = f"""
 You are a real estate assistant. Compare the user's property (rent: £{user_rent}) to these similar listings (rents: {[l['rent'] for l in similar_listings]}). In 1-2 sentences, summarize if the user's price is above, below, or in line with the local market, and mention any notable differences in features if possible. Be concise and helpful.
 """
@@ -412,7 +477,7 @@ You are a real estate assistant. Compare the user's property (rent: £{user_rent
                 except Exception as e:
                     return f"✅ Property and prediction saved!\n\nNo similar listings found and semantic search failed: {e}"
             out = "✅ Property and prediction saved!\n\n**Similar Listings Nearby:**\n\n"
-            for _, row in similar.head(5).iterrows():
+            for row in similar.head(5).to_dict('records'):
                 out += (
                     f"- Address: {row.get('address','')}, Bedrooms: {row.get('BEDROOMS','')}, Bathrooms: {row.get('BATHROOMS','')}, Size: {row.get('SIZE','')} sq ft, Property Type: {row.get('PROPERTY TYPE','')}, Rent: £{row.get('rent','')}\n"
                 )
@@ -496,7 +561,7 @@ You are a real estate assistant. Compare the user's property (rent: £{user_rent
                                 pass
                         user_rent = float(pred.get('predicted_rent', 0))
                         # LLM summary
-                        llm = ChatOpenAI(model="gpt-4", temperature=0.3, openai_api_key=openai_api_key)
+                        llm = get_chat("gpt-4", 0.3)
                         summary_prompt = f"""
 You are a real estate assistant. Compare the user's property (rent: £{user_rent}) to these similar listings (rents: {[l['rent'] for l in similar_listings]}). In 1-2 sentences, summarize if the user's price is above, below, or in line with the local market, and mention any notable differences in features if possible. Be concise and helpful.
 """
@@ -536,44 +601,36 @@ You are a real estate assistant. Compare the user's property (rent: £{user_rent
 
     def needs_confirmation(self, user_message):
         # Only treat as confirmation if the user is confirming the information, not to trigger the model
-        confirmation_phrases = ["yes", "correct", "that's right", "yep", "confirmed", "go ahead", "proceed"]
-        return user_message.strip().lower() in confirmation_phrases
+        return user_message.strip().lower() in _CONFIRM_SET
 
-    def should_run_model(self, conversation_history, candidate_fields):
+    def should_run_model(self, conversation_history, candidate_fields, last_assistant_content=None):
         # Only run the model if all required fields are present and the last assistant message explicitly asks for confirmation
         if not candidate_fields or not all(f in candidate_fields and candidate_fields[f] not in (None, '', 0, 0.0) for f in self.required_fields):
             return False
-        if not conversation_history:
+        if last_assistant_content is None:
+            last_assistant_content = find_last_assistant_content(conversation_history)
+        if not last_assistant_content:
             return False
-        last_assistant = next((m for m in reversed(conversation_history) if m["role"] == "assistant"), None)
-        if not last_assistant:
-            return False
-        confirmation_keywords = [
-            "please confirm", "is this information correct", "is this correct", "can you confirm", "are these details correct"
-        ]
-        return any(kw in last_assistant["content"].lower() for kw in confirmation_keywords)
+        return bool(_CONFIRM_KW_RE.search(last_assistant_content))
 
-    def handle(self, conversation_history, user_message, last_candidate_fields=None):
+    def handle(self, conversation_history, user_message, last_candidate_fields=None, last_assistant_content=None):
         candidate_fields = self.extract_fields(user_message, conversation_history, last_candidate_fields)
         # Only keep rent fields
         rent_fields = {k: v for k, v in (last_candidate_fields or candidate_fields).items() if k in self.required_fields}
-        # Run model if user confirms and all required fields are present (ignore last assistant message)
+        # Run model if user confirms, all required fields are present and the details were summarised for confirmation
         if self.needs_confirmation(user_message):
             fields = rent_fields
             if all(f in fields and fields[f] not in (None, '', 0, 0.0) for f in self.required_fields):
-                result = self.run_model(fields)
-                return {"response": result, "action": "rent_prediction", "fields": fields}
+                if self.should_run_model(conversation_history, fields, last_assistant_content):
+                    result = self.run_model(fields)
+                    return {"response": result, "action": "rent_prediction", "fields": fields}
+                # Not asked to confirm yet: let the LLM flow summarise the details first
             else:
                 missing = [f for f in self.required_fields if f not in fields or fields[f] in (None, '', 0, 0.0)]
                 return {"response": f"I need the following details to estimate rent: {', '.join(missing)}. Please provide them.", "action": "ask_for_info", "fields": fields}
         # Otherwise, continue the LLM-driven flow
-        messages = [
-            {"role": "system", "content": self.system_prompt}
-        ]
-        for msg in conversation_history:
-            messages.append({"role": msg["role"], "content": msg["content"]})
-        messages.append({"role": "user", "content": user_message})
-        response = self.chat.invoke([HumanMessage(content=m["content"]) for m in messages])
+        messages = to_langchain_messages(self.system_prompt, conversation_history, user_message)
+        response = self.chat.invoke(messages)
         reply = response.content.strip()
         extracted = self.extract_fields(reply, conversation_history, candidate_fields)
         return {"response": reply, "action": "chat", "fields": extracted}
@@ -587,6 +644,8 @@ class TenantScreeningHandler(BaseModuleHandler):
         "employment_status": ["employment status", "job", "occupation", "employed", "unemployed", "self-employed", "work status"],
         "eviction_record": ["eviction record", "prior eviction", "evicted", "has eviction", "any eviction", "eviction", "has prior eviction", "previous eviction", "eviction history"]
     }
+    _FIELD_SYNONYM_FLAT = frozenset(syn for syns in FIELD_SYNONYMS.values() for syn in syns)
+
     def __init__(self):
         self.system_prompt = (
             "You are LandlordBuddy, an expert and professional AI assistant for landlords. "
@@ -604,14 +663,10 @@ class TenantScreeningHandler(BaseModuleHandler):
             "When starting tenant screening, always ask for all required information at once, listing each required field (credit score, income, rent, employment status, eviction record) in a clear, markdown-formatted list. "
             "Do not ask for fields one by one. If any are missing, ask for all missing fields together in a single message. "
         )
-        self.chat = ChatOpenAI(model="gpt-4", temperature=0.7, openai_api_key=openai_api_key)
+        self.chat = get_chat("gpt-4", 0.7)
 
     def extract_fields(self, user_message, conversation_history, last_candidate_fields=None):
         # Use LLM to extract fields in a structured way, similar to rent prediction
-        from langchain.output_parsers import PydanticOutputParser
-        from pydantic import BaseModel, Field, ValidationError
-        from langchain_core.prompts import ChatPromptTemplate
-        import re
         class TenantFields(BaseModel):
             credit_score: int = Field(0, description="Applicant's credit score")
             income: float = Field(0, description="Applicant's monthly income")
@@ -631,14 +686,14 @@ class TenantScreeningHandler(BaseModuleHandler):
             user_message=user_message,
             format_instructions=format_instructions
         )
-        response = self.chat.invoke([HumanMessage(content=prompt_value.to_string())])
+        response = self.chat.invoke(prompt_value.to_messages())
         content = response.content.strip()
         try:
             parsed = parser.parse(content)
             fields = parsed.dict()
         except ValidationError:
-            # Fallback: regex extraction as before
-            fields = dict(last_candidate_fields) if last_candidate_fields else {}
+            # Fallback: regex extraction as before (new values shadow the previous ones without copying them)
+            fields = ChainMap({}, last_candidate_fields or {})
             markdown_field_pattern = re.compile(r"(?:^|\n)[\-\d\.\*\s]*\*?\*?([A-Za-z0-9_\s]+?)\*?\*?\s*[:：]\s*([\w\-,.\/()'’\s]+)", re.IGNORECASE)
             for match in markdown_field_pattern.finditer(all_text):
                 raw_field, value = match.group(1).strip(), match.group(2).strip()
@@ -680,7 +735,6 @@ class TenantScreeningHandler(BaseModuleHandler):
             v = fields.get(k, 0 if k in ["credit_score", "income", "rent"] else (False if k == "eviction_record" else ""))
             # Special handling for income: if string like '50 a month', extract number
             if k == "income" and isinstance(v, str):
-                import re
                 match = re.search(r"(\d+(?:\.\d+)?)", v)
                 if match:
                     v = float(match.group(1))
@@ -705,17 +759,18 @@ class TenantScreeningHandler(BaseModuleHandler):
         return clean_fields
 
     def summarize_fields(self, fields):
-        summary = "**Tenant Screening Details:**\n\n"
-        for k in fields:
-            v = fields.get(k, "[missing]")
-            if k == "eviction_record":
-                v = "Yes" if v is True else ("No" if v is False else v)
-            summary += f"- **{k.replace('_', ' ').title()}**: {v}\n"
-        summary += "\nIs this correct? Please confirm so I can screen the tenant."
-        return summary
+        field_lines = "".join(
+            f"- **{k.replace('_', ' ').title()}**: "
+            f"{('Yes' if v is True else 'No' if v is False else v) if k == 'eviction_record' else v}\n"
+            for k, v in fields.items()
+        )
+        return (
+            "**Tenant Screening Details:**\n\n"
+            f"{field_lines}"
+            "\nIs this correct? Please confirm so I can screen the tenant."
+        )
 
     def run_model(self, fields):
-        from tenant_screening import screen_tenant  # Absolute import for script/module compatibility
         credit_score = int(fields.get("credit_score", 0) or 0)
         income = float(fields.get("income", 0) or 0)
         rent = float(fields.get("rent", 0) or 0)
@@ -726,22 +781,22 @@ class TenantScreeningHandler(BaseModuleHandler):
         result = screen_tenant(credit_score, income, rent, employment_status, eviction_record)
         print("DOne with script")
         # Compose a brief summary based on recommendation
-        summary = ""
         if result['recommendation'].lower() in ['approve', 'accept', 'approved', 'accepted']:
             summary = "✅ **Tenant Approved:** This applicant meets the screening criteria."
         elif result['recommendation'].lower() == 'review':
             summary = "⚠️ **Tenant Requires Further Review:** Some risk factors were detected."
         else:
             summary = "❌ **Tenant Rejected:** This applicant does not meet the screening criteria."
-        md = f"{summary}\n\n**Tenant Screening Result:**\n\n"
-        md += f"- **Recommendation:** {result['recommendation']}\n"
-        md += f"- **Risk Score:** {result['risk_score']}\n"
-        md += f"- **Details:**\n"
-        for line in result['explanation'].split('\n'):
-            md += f"  - {line}\n"
-        return md
-
-    def handle(self, conversation_history, user_message, last_candidate_fields=None):
+        details = "".join(f"  - {line}\n" for line in result['explanation'].split('\n'))
+        return (
+            f"{summary}\n\n**Tenant Screening Result:**\n\n"
+            f"- **Recommendation:** {result['recommendation']}\n"
+            f"- **Risk Score:** {result['risk_score']}\n"
+            f"- **Details:**\n"
+            f"{details}"
+        )
+
+    def handle(self, conversation_history, user_message, last_candidate_fields=None, last_assistant_content=None):
         # Always merge new extracted fields with last candidate fields, only for required fields
         new_fields = self.extract_fields(user_message, conversation_history, last_candidate_fields)
         
@@ -768,11 +823,13 @@ class TenantScreeningHandler(BaseModuleHandler):
             else:  # employment_status
                 tenant_fields[k] = merged_fields.get(k, "")
         
-        # --- After user confirmation, always run the script if all required fields are present ---
+        # --- After user confirmation of the summarised details, run the script if all required fields are present ---
         if self.needs_confirmation(user_message):
             if all(self._is_field_filled(k, tenant_fields.get(k)) for k in self.required_fields):
-                result = self.run_model(tenant_fields)
-                return {"response": result, "action": "screen_tenant", "fields": tenant_fields}
+                if self.should_run_model(conversation_history, tenant_fields, last_assistant_content):
+                    result = self.run_model(tenant_fields)
+                    return {"response": result, "action": "screen_tenant", "fields": tenant_fields}
+                # Not asked to confirm yet: let the LLM flow summarise the details first
             else:
                 return {
                     "response": "Sorry, I couldn't run the tenant screening script because some required information is missing. Please provide all the details (credit score, income, rent, employment status, and eviction record).",
@@ -781,41 +838,24 @@ class TenantScreeningHandler(BaseModuleHandler):
                 }
         
         # Otherwise, continue the LLM-driven flow
-        messages = [
-            {"role": "system", "content": self.system_prompt}
-        ]
-        for msg in conversation_history:
-            messages.append({"role": msg["role"], "content": msg["content"]})
-        messages.append({"role": "user", "content": user_message})
+        messages = to_langchain_messages(self.system_prompt, conversation_history, user_message)
         
-        response = self.chat.invoke([HumanMessage(content=m["content"]) for m in messages])
+        response = self.chat.invoke(messages)
         reply = response.content.strip()
         
         # Remove any LLM advice/summary or extra fields
-        for phrase in [
-            "please wait", "processing", "hold on", "one moment", "I'll process", "wait a moment",
-            "it's important to exercise caution", "you may wish to consider", "you may want to explore",
-            "consider requesting a guarantor", "By considering these factors", "Tips for Landlord",
-            "Based on the information provided", "Summary:"
-        ]:
-            reply = reply.replace(phrase, "")
-            reply = reply.replace(phrase.capitalize(), "")
+        reply = _ADVICE_RE.sub("", reply)
         
         # Remove lines with extra fields
-        lines = reply.split('\n')
-        filtered_lines = []
-        for line in lines:
-            if any(field in line.lower() for field in ["full name", "rental history", "name:", "history:", "annual income", "tenant's name"]):
-                continue
-            filtered_lines.append(line)
-        reply = '\n'.join(filtered_lines)
-        
-        # Extract fields from reply and merge again
-        reply_fields = self.extract_fields(reply, conversation_history, tenant_fields)
-        for k in self.required_fields:
-            v = reply_fields.get(k, None)
-            if v not in (None, '', 0, 0.0, False):
-                tenant_fields[k] = v
+        reply = '\n'.join(line for line in reply.split('\n') if not _EXTRA_FIELD_LINE_RE.search(line))
+        
+        # Extract fields from reply and merge again (skipped when the reply can't contain any)
+        if self.reply_mentions_fields(reply):
+            reply_fields = self.extract_fields(reply, conversation_history, tenant_fields)
+            for k in self.required_fields:
+                v = reply_fields.get(k, None)
+                if v not in (None, '', 0, 0.0, False):
+                    tenant_fields[k] = v
         
         # Always return only tenant screening fields
         return {"response": reply, "action": "chat", "fields": tenant_fields}
@@ -829,19 +869,15 @@ class TenantScreeningHandler(BaseModuleHandler):
             return bool(value and str(value).strip())
         return value not in (None, '', False)
 
-    def should_run_model(self, conversation_history, candidate_fields):
+    def should_run_model(self, conversation_history, candidate_fields, last_assistant_content=None):
         # Only run the model if all required fields are present and the last assistant message explicitly asks for confirmation
-        if not candidate_fields or not all(f in candidate_fields and candidate_fields[f] not in (None, '', 0, 0.0, False) for f in self.required_fields):
-            return False
-        if not conversation_history:
+        if not candidate_fields or not all(self._is_field_filled(f, candidate_fields.get(f)) for f in self.required_fields):
             return False
-        last_assistant = next((m for m in reversed(conversation_history) if m["role"] == "assistant"), None)
-        if not last_assistant:
+        if last_assistant_content is None:
+            last_assistant_content = find_last_assistant_content(conversation_history)
+        if not last_assistant_content:
             return False
-        confirmation_keywords = [
-            "please confirm", "is this information correct", "is this correct", "can you confirm", "are these details correct", "please confirm so i can screen the tenant"
-        ]
-        return any(kw in last_assistant["content"].lower() for kw in confirmation_keywords)
+        return bool(_CONFIRM_KW_RE.search(last_assistant_content))
 
 # --- Predictive Maintenance Integration ---
 
@@ -867,6 +903,7 @@ class MaintenancePredictionHandler(BaseModuleHandler):
     }
     _model = None
     _address_map = None
+    _feature_cols = ['address', 'age_years', 'last_service_years_ago', 'seasonality']
     _model_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../predictive_maintenance_ai/models/maintenance_rf_model.pkl'))
     _address_map_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../Rent_Pricing_AI/address_map.json'))
     
@@ -884,7 +921,7 @@ class MaintenancePredictionHandler(BaseModuleHandler):
             "Always keep the conversation natural and helpful. "
             "Respond in markdown."
         )
-        self.chat = ChatOpenAI(model="gpt-4", temperature=0.7, openai_api_key=openai_api_key)
+        self.chat = get_chat("gpt-4", 0.7)
 
     @classmethod
     def get_model(cls):
@@ -913,7 +950,6 @@ class MaintenancePredictionHandler(BaseModuleHandler):
                 print(f"[DEBUG] Model loaded successfully: {type(cls._model)}")
                 
                 # Test prediction capability with dummy data
-                import pandas as pd
                 test_df = pd.DataFrame([{
                     'address': 0,
                     'age_years': 50,
@@ -925,7 +961,6 @@ class MaintenancePredictionHandler(BaseModuleHandler):
                 
             except Exception as e:
                 print(f"[ERROR] Failed to load maintenance model: {e}")
-                import traceback
                 traceback.print_exc()
                 raise Exception(f"Maintenance model loading failed: {e}")
         return cls._model
@@ -934,14 +969,12 @@ class MaintenancePredictionHandler(BaseModuleHandler):
     def get_address_map(cls):
         if cls._address_map is None:
             try:
-                import json
                 print(f"[DEBUG] Loading address map from: {cls._address_map_path}")
                 with open(cls._address_map_path, 'r', encoding='utf-8') as f:
                     cls._address_map = json.load(f)
                 print(f"[DEBUG] Address map loaded: {len(cls._address_map)} entries")
             except Exception as e:
                 print(f"[ERROR] Failed to load address map: {e}")
-                import traceback
                 traceback.print_exc()
                 raise
         return cls._address_map
@@ -967,10 +1000,6 @@ class MaintenancePredictionHandler(BaseModuleHandler):
 
     def extract_fields(self, user_message, conversation_history, last_candidate_fields=None):
         # Use LLM/PydanticOutputParser for robust extraction (like rent/tenant handlers), with improved fallback
-        from langchain.output_parsers import PydanticOutputParser
-        from pydantic import BaseModel, Field, ValidationError
-        from langchain_core.prompts import ChatPromptTemplate
-        import re
         class MaintFields(BaseModel):
             address: str = Field('', description="The property address or location")
             age_years: int = Field(0, description="Property age in years")
@@ -993,12 +1022,12 @@ class MaintenancePredictionHandler(BaseModuleHandler):
             format_instructions=format_instructions
         )
         try:
-            response = self.chat.invoke([HumanMessage(content=prompt_value.to_string())])
+            response = self.chat.invoke(prompt_value.to_messages())
             content = response.content.strip()
             parsed = parser.parse(content)
             fields = parsed.dict()
         except Exception:
-            fields = dict(last_candidate_fields) if last_candidate_fields else {}
+            fields = ChainMap({}, last_candidate_fields or {})
 
         # 2. Fallback: regex/natural language extraction for robust field parsing
         # Address: look for 'property at|property on|property in|property' ... up to 'constructed' or 'built' or 'last service' or ','
@@ -1046,32 +1075,26 @@ class MaintenancePredictionHandler(BaseModuleHandler):
         return clean_fields
 
     def summarize_fields(self, fields):
-        summary = "**Property Information for Maintenance Prediction:**\n\n"
-        for k, v in fields.items():
-            summary += f"- **{k}**: {v}\n"
-        summary += "\nIs this information correct? Please confirm to proceed with the maintenance risk assessment."
-        return summary
+        field_lines = "".join(f"- **{k}**: {v}\n" for k, v in fields.items())
+        return (
+            "**Property Information for Maintenance Prediction:**\n\n"
+            f"{field_lines}"
+            "\nIs this information correct? Please confirm to proceed with the maintenance risk assessment."
+        )
 
     def needs_confirmation(self, user_message):
-        confirmation_phrases = ["yes", "correct", "that's right", "yep", "confirmed", "go ahead", "proceed"]
-        return user_message.strip().lower() in confirmation_phrases
+        return user_message.strip().lower() in _CONFIRM_SET
 
-    def should_run_model(self, conversation_history, candidate_fields):
+    def should_run_model(self, conversation_history, candidate_fields, last_assistant_content=None):
         if not candidate_fields or not all(f in candidate_fields and candidate_fields[f] not in (None, '', 0, 0.0) for f in self.required_fields):
             return False
-        if not conversation_history:
-            return False
-        last_assistant = next((m for m in reversed(conversation_history) if m["role"] == "assistant"), None)
-        if not last_assistant:
+        if last_assistant_content is None:
+            last_assistant_content = find_last_assistant_content(conversation_history)
+        if not last_assistant_content:
             return False
-        confirmation_keywords = [
-            "please confirm", "is this information correct", "is this correct", "can you confirm", "are these details correct"
-        ]
-        return any(kw in last_assistant["content"].lower() for kw in confirmation_keywords)
+        return bool(_CONFIRM_KW_RE.search(last_assistant_content))
 
     def run_model(self, fields):
-        import pandas as pd
-        
         print(f"[DEBUG] Maintenance prediction starting with fields: {fields}")
         
         try:
@@ -1086,23 +1109,21 @@ class MaintenancePredictionHandler(BaseModuleHandler):
             encoded_fields = self.encode_fields_for_model(fields)
             print(f"[DEBUG] Encoded fields: {encoded_fields}")
             
-            # Prepare input data in the exact format the model expects
-            input_df = pd.DataFrame([{
+            # Prepare input row in the exact format the model expects
+            input_row = {
                 'address': encoded_fields.get('address', 0),  # Use encoded address
                 'age_years': int(encoded_fields.get('age_years', 0)),
                 'last_service_years_ago': int(encoded_fields.get('last_service_years_ago', 0)),
                 'seasonality': str(encoded_fields.get('seasonality', 'winter')).lower()
-            }])
+            }
             
-            print(f"[DEBUG] Input DataFrame: {input_df}")
-            print(f"[DEBUG] Input DataFrame dtypes: {input_df.dtypes}")
+            print(f"[DEBUG] Input row: {input_row}")
             
             # Make prediction
-            risk_score = model.predict(input_df)[0]
+            risk_score = model.predict(pd.DataFrame([input_row], columns=self._feature_cols))[0]
             print(f"[DEBUG] Risk score predicted: {risk_score}")
         except Exception as e:
             print(f"[ERROR] Error during model prediction: {e}")
-            import traceback
             traceback.print_exc()
             raise
         
@@ -1136,10 +1157,7 @@ class MaintenancePredictionHandler(BaseModuleHandler):
             f"- **Predicted Maintenance Risk Score:** {risk_score:.2f}\n"
             f"- **Recommended Action:** {action}\n\n"
             f"**What you should do:**\n"
-        )
-        
-        for i, rec in enumerate(recommendations, 1):
-            summary += f"{i}. {rec}\n"
+        ) + "".join(f"{i}. {rec}\n" for i, rec in enumerate(recommendations, 1))
         
         explanation = (
             "\n**How this was calculated:**\n"
@@ -1148,7 +1166,7 @@ class MaintenancePredictionHandler(BaseModuleHandler):
         )
         return summary + explanation
 
-    def handle(self, conversation_history, user_message, last_candidate_fields=None):
+    def handle(self, conversation_history, user_message, last_candidate_fields=None, last_assistant_content=None):
         # Extract fields from the current message
         candidate_fields = self.extract_fields(user_message, conversation_history, last_candidate_fields)
         
@@ -1168,9 +1186,12 @@ class MaintenancePredictionHandler(BaseModuleHandler):
         print(f"[DEBUG] Maintenance handler - filtered fields: {maintenance_fields}")
         print(f"[DEBUG] Maintenance handler - required fields: {self.required_fields}")
         
-        # Check if user is confirming with complete information
+        # Check if user is confirming the summarised details with complete information
         if self.needs_confirmation(user_message):
-            if all(f in maintenance_fields and maintenance_fields[f] not in (None, '', 0, 0.0) for f in self.required_fields):
+            if not all(f in maintenance_fields and maintenance_fields[f] not in (None, '', 0, 0.0) for f in self.required_fields):
+                missing = [f for f in self.required_fields if f not in maintenance_fields or maintenance_fields[f] in (None, '', 0, 0.0)]
+                return {"response": f"I need the following details to predict maintenance risk: {', '.join(missing)}. Please provide them.", "action": "ask_for_info", "fields": maintenance_fields}
+            if self.should_run_model(conversation_history, maintenance_fields, last_assistant_content):
                 try:
                     print(f"[DEBUG] Running maintenance prediction with fields: {maintenance_fields}")
                     result = self.run_model(maintenance_fields)
@@ -1178,16 +1199,12 @@ class MaintenancePredictionHandler(BaseModuleHandler):
                     return {"response": result, "action": "maintenance_prediction", "fields": maintenance_fields}
                 except Exception as e:
                     print(f"[ERROR] Maintenance prediction failed: {e}")
-                    import traceback
                     traceback.print_exc()
                     error_message = (
                         "I apologize, but I encountered an error while analyzing your property for maintenance prediction. "
                         "This could be due to a temporary system issue. Please try again in a moment, or contact support if the problem persists."
                     )
                     return {"response": error_message, "action": "error", "fields": maintenance_fields}
-            else:
-                missing = [f for f in self.required_fields if f not in maintenance_fields or maintenance_fields[f] in (None, '', 0, 0.0)]
-                return {"response": f"I need the following details to predict maintenance risk: {', '.join(missing)}. Please provide them.", "action": "ask_for_info", "fields": maintenance_fields}
         
         # Check if we have all required fields to ask for confirmation
         if all(f in maintenance_fields and maintenance_fields[f] not in (None, '', 0, 0.0) for f in self.required_fields):
@@ -1195,14 +1212,9 @@ class MaintenancePredictionHandler(BaseModuleHandler):
             return {"response": summary, "action": "chat", "fields": maintenance_fields}
         
         # Otherwise, continue the LLM-driven flow to ask for missing information
-        messages = [
-            {"role": "system", "content": self.system_prompt}
-        ]
-        for msg in conversation_history:
-            messages.append({"role": msg["role"], "content": msg["content"]})
-        messages.append({"role": "user", "content": user_message})
+        messages = to_langchain_messages(self.system_prompt, conversation_history, user_message)
         
-        response = self.chat.invoke([HumanMessage(content=m["content"]) for m in messages])
+        response = self.chat.invoke(messages)
         reply = response.content.strip()
         
         # Extract any additional fields from the LLM response
@@ -1252,6 +1264,14 @@ def detect_intent(user_message, conversation_history=None):
         return None
 
 # --- Enhanced LLM-based Intent Detection with Entity Recognition ---
+# Fixed instruction text for the fallback intent classifier. Kept byte-identical across
+# calls and sent first so the provider can cache the prompt prefix; per-turn data goes after it.
+_INTENT_SYSTEM_PROMPT = (
+    "You are an expert assistant for landlords. "
+    "Given the following conversation, classify the user's current intent as one of: 'rent_prediction', 'tenant_screening', 'maintenance_prediction', 'greeting', or 'other'. "
+    "Only output the intent keyword."
+)
+
 def llm_detect_intent(conversation_history, user_message):
     """
     Enhanced LLM-based intent detection with entity recognition and multi-intent support.
@@ -1274,18 +1294,13 @@ def llm_detect_intent(conversation_history, user_message):
     except Exception as e:
         print(f"[WARNING] Enhanced LLM intent detection failed, using fallback: {e}")
         # Fallback to basic LLM detection
-        from langchain_openai import ChatOpenAI
-        chat = ChatOpenAI(model="gpt-4", temperature=0, openai_api_key=openai_api_key)
         # Use last 4-5 messages for context
-        history = conversation_history[-5:] if len(conversation_history) > 5 else conversation_history
+        history = conversation_history[-5:]
         context = "\n".join([f"{m['role']}: {m['content']}" for m in history])
-        prompt = (
-            "You are an expert assistant for landlords. "
-            "Given the following conversation, classify the user's current intent as one of: 'rent_prediction', 'tenant_screening', 'maintenance_prediction', 'greeting', or 'other'. "
-            "Only output the intent keyword.\n"
-            f"Conversation:\n{context}\nUser message:\n{user_message}\nIntent:"
-        )
-        response = chat.invoke([HumanMessage(content=prompt)])
+        response = get_chat("gpt-4", 0).invoke([
+            _lc_message("system", _INTENT_SYSTEM_PROMPT),
+            HumanMessage(content=f"Conversation:\n{context}\nUser message:\n{user_message}\nIntent:")
+        ])
         intent = response.content.strip().lower()
         if "greeting" in intent or "hello" in intent or "hi" in intent:
             return "greeting"
@@ -1307,12 +1322,12 @@ def user_requests_intent_switch(user_message):
 
 # --- Enhanced Conversational Engine with Milvus and Advanced Intelligence ---
 def enhanced_conversational_engine(conversation_history, user_message, last_candidate_fields=None, 
-                                 last_intent=None, intent_completed=False, session_id=None, user_id=None):
+                                 last_intent=None, intent_completed=False, session_id=None, user_id=None,
+                                 last_assistant_content=None):
     """
     Enhanced modular conversational engine for LandlordBuddy.
     Uses Milvus for memory and advanced NER/intent detection.
     """
-    import time
     
     try:
         timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
@@ -1340,7 +1355,7 @@ def enhanced_conversational_engine(conversation_history, user_message, last_cand
             # Fallback immediately to basic engine if conversation AI fails
             print(f"[ENHANCED_ENGINE] Falling back to basic conversational engine")
             return conversational_engine(conversation_history, user_message, last_candidate_fields, 
-                                       last_intent, intent_completed)
+                                       last_intent, intent_completed, last_assistant_content)
         
         print(f"[ENHANCED_ENGINE] Step 3: Storing user message in Milvus...")
         # Store user message in Milvus if available
@@ -1402,7 +1417,7 @@ def enhanced_conversational_engine(conversation_history, user_message, last_cand
             # Fallback to basic engine if analysis fails
             print(f"[ENHANCED_ENGINE] Falling back to basic conversational engine due to analysis failure")
             return conversational_engine(conversation_history, user_message, last_candidate_fields, 
-                                       last_intent, intent_completed)
+                                       last_intent, intent_completed, last_assistant_content)
         
         # Handle greeting intent
         if primary_intent == IntentType.GREETING:
@@ -1454,17 +1469,15 @@ def enhanced_conversational_engine(conversation_history, user_message, last_cand
         elif primary_intent == IntentType.RENT_PREDICTION:
             handler = RentPredictionHandler()
             # Merge AI-extracted entities with existing fields
-            merged_fields = dict(last_candidate_fields) if last_candidate_fields else {}
-            merged_fields.update(extracted_entities)
-            result = handler.handle(enhanced_history, user_message, merged_fields)
+            merged_fields = ChainMap(extracted_entities, last_candidate_fields or {})
+            result = handler.handle(enhanced_history, user_message, merged_fields, last_assistant_content)
             result["last_intent"] = "rent_prediction" if not result.get("action") == "rent_prediction" else None
             result["intent_completed"] = result.get("action") == "rent_prediction"
         
         elif primary_intent == IntentType.TENANT_SCREENING:
             handler = TenantScreeningHandler()
-            merged_fields = dict(last_candidate_fields) if last_candidate_fields else {}
-            merged_fields.update(extracted_entities)
-            result = handler.handle(enhanced_history, user_message, merged_fields)
+            merged_fields = ChainMap(extracted_entities, last_candidate_fields or {})
+            result = handler.handle(enhanced_history, user_message, merged_fields, last_assistant_content)
             result["last_intent"] = "tenant_screening" if not result.get("action") == "screen_tenant" else None
             result["intent_completed"] = result.get("action") == "screen_tenant"
         
@@ -1474,11 +1487,10 @@ def enhanced_conversational_engine(conversation_history, user_message, last_cand
                 handler = MaintenancePredictionHandler()
                 print(f"[DEBUG] Maintenance handler initialized successfully")
                 
-                merged_fields = dict(last_candidate_fields) if last_candidate_fields else {}
-                merged_fields.update(extracted_entities)
+                merged_fields = ChainMap(extracted_entities, last_candidate_fields or {})
                 print(f"[DEBUG] Processing maintenance prediction with fields: {merged_fields}")
                 
-                result = handler.handle(enhanced_history, user_message, merged_fields)
+                result = handler.handle(enhanced_history, user_message, merged_fields, last_assistant_content)
                 print(f"[DEBUG] Maintenance handler completed with action: {result.get('action')}")
                 
                 result["last_intent"] = "maintenance_prediction" if not result.get("action") == "maintenance_prediction" else None
@@ -1488,7 +1500,6 @@ def enhanced_conversational_engine(conversation_history, user_message, last_cand
                 
             except Exception as e:
                 print(f"[ERROR] Maintenance prediction failed in enhanced engine: {e}")
-                import traceback
                 traceback.print_exc()
                 
                 # Return safe fallback response
@@ -1507,32 +1518,28 @@ def enhanced_conversational_engine(conversation_history, user_message, last_cand
         elif last_intent and not intent_completed:
             if last_intent == "rent_prediction":
                 handler = RentPredictionHandler()
-                merged_fields = dict(last_candidate_fields) if last_candidate_fields else {}
-                merged_fields.update(extracted_entities)
-                result = handler.handle(enhanced_history, user_message, merged_fields)
+                merged_fields = ChainMap(extracted_entities, last_candidate_fields or {})
+                result = handler.handle(enhanced_history, user_message, merged_fields, last_assistant_content)
                 result["last_intent"] = last_intent if not result.get("action") == "rent_prediction" else None
                 result["intent_completed"] = result.get("action") == "rent_prediction"
             elif last_intent == "tenant_screening":
                 handler = TenantScreeningHandler()
-                merged_fields = dict(last_candidate_fields) if last_candidate_fields else {}
-                merged_fields.update(extracted_entities)
-                result = handler.handle(enhanced_history, user_message, merged_fields)
+                merged_fields = ChainMap(extracted_entities, last_candidate_fields or {})
+                result = handler.handle(enhanced_history, user_message, merged_fields, last_assistant_content)
                 result["last_intent"] = last_intent if not result.get("action") == "screen_tenant" else None
                 result["intent_completed"] = result.get("action") == "screen_tenant"
             elif last_intent == "maintenance_prediction":
                 try:
                     print(f"[DEBUG] Continuing maintenance prediction with last_intent...")
                     handler = MaintenancePredictionHandler()
-                    merged_fields = dict(last_candidate_fields) if last_candidate_fields else {}
-                    merged_fields.update(extracted_entities)
+                    merged_fields = ChainMap(extracted_entities, last_candidate_fields or {})
                     
-                    result = handler.handle(enhanced_history, user_message, merged_fields)
+                    result = handler.handle(enhanced_history, user_message, merged_fields, last_assistant_content)
                     result["last_intent"] = last_intent if not result.get("action") == "maintenance_prediction" else None
                     result["intent_completed"] = result.get("action") == "maintenance_prediction"
                     
                 except Exception as e:
                     print(f"[ERROR] Maintenance prediction continuation failed: {e}")
-                    import traceback
                     traceback.print_exc()
                     
                     result = {
@@ -1589,16 +1596,16 @@ def enhanced_conversational_engine(conversation_history, user_message, last_cand
         # Fallback to original engine if enhanced version fails
         print(f"[WARNING] Enhanced engine failed, falling back to original: {e}")
         return conversational_engine(conversation_history, user_message, last_candidate_fields, 
-                                   last_intent, intent_completed)
+                                   last_intent, intent_completed, last_assistant_content)
 
 # --- Original Conversational Engine (Fallback) ---
-def conversational_engine(conversation_history, user_message, last_candidate_fields=None, last_intent=None, intent_completed=False):
+def conversational_engine(conversation_history, user_message, last_candidate_fields=None, last_intent=None, intent_completed=False,
+                          last_assistant_content=None):
     """
     Modular conversational engine for LandlordBuddy.
     Routes to the correct module handler based on detected intent.
     This is the bulletproof fallback engine that should NEVER fail.
     """
-    import time
     
     timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] BASIC_ENGINE_START")
@@ -1632,7 +1639,7 @@ def conversational_engine(conversation_history, user_message, last_candidate_fie
             print(f"[BASIC_ENGINE] MaintenancePredictionHandler initialized successfully")
             
             print(f"[BASIC_ENGINE] Calling handler.handle()...")
-            result = handler.handle(conversation_history, user_message, last_candidate_fields)
+            result = handler.handle(conversation_history, user_message, last_candidate_fields, last_assistant_content)
             print(f"[BASIC_ENGINE] MaintenancePredictionHandler completed with action: {result.get('action')}")
             
             if result.get("action") == "maintenance_prediction":
@@ -1645,7 +1652,6 @@ def conversational_engine(conversation_history, user_message, last_candidate_fie
             return {**result, "last_intent": "maintenance_prediction" if not intent_completed else None, "intent_completed": intent_completed}
         except Exception as e:
             print(f"[BASIC_ENGINE] ERROR: Maintenance handler failed: {e}")
-            import traceback
             traceback.print_exc()
             
             # Emergency fallback for maintenance
@@ -1708,8 +1714,7 @@ def conversational_engine(conversation_history, user_message, last_candidate_fie
         print(f"[BASIC_ENGINE] Fallback intent: {intent}")
     
     print(f"[BASIC_ENGINE] Step 4: Processing intent '{intent}'")
-    confirmation_phrases = ["yes", "correct", "that's right", "yep", "confirmed", "go ahead", "proceed"]
-    is_confirmation = user_message.strip().lower() in confirmation_phrases
+    is_confirmation = user_message.strip().lower() in _CONFIRM_SET
     print(f"[BASIC_ENGINE] Is confirmation: {is_confirmation}")
 
     # Handle each intent with bulletproof error handling
@@ -1730,7 +1735,7 @@ def conversational_engine(conversation_history, user_message, last_candidate_fie
         print(f"[BASIC_ENGINE] Processing rent prediction intent")
         try:
             handler = RentPredictionHandler()
-            result = handler.handle(conversation_history, user_message, last_candidate_fields)
+            result = handler.handle(conversation_history, user_message, last_candidate_fields, last_assistant_content)
             # If model was run, mark intent as completed
             if result.get("action") == "screen_tenant" or result.get("action") == "rent_prediction":
                 intent_completed = True
@@ -1738,7 +1743,6 @@ def conversational_engine(conversation_history, user_message, last_candidate_fie
             return {**result, "last_intent": intent if not intent_completed else None, "intent_completed": intent_completed}
         except Exception as e:
             print(f"[BASIC_ENGINE] ERROR: Rent prediction handler failed: {e}")
-            import traceback
             traceback.print_exc()
             return {
                 "response": "I can help you predict rent prices. Please provide property details like address, bedrooms, bathrooms, and size.",
@@ -1751,14 +1755,13 @@ def conversational_engine(conversation_history, user_message, last_candidate_fie
         print(f"[BASIC_ENGINE] Processing tenant screening intent")
         try:
             handler = TenantScreeningHandler()
-            result = handler.handle(conversation_history, user_message, last_candidate_fields)
+            result = handler.handle(conversation_history, user_message, last_candidate_fields, last_assistant_content)
             if result.get("action") == "screen_tenant":
                 intent_completed = True
             print(f"[BASIC_ENGINE] Tenant screening completed with action: {result.get('action')}")
             return {**result, "last_intent": intent if not intent_completed else None, "intent_completed": intent_completed}
         except Exception as e:
             print(f"[BASIC_ENGINE] ERROR: Tenant screening handler failed: {e}")
-            import traceback
             traceback.print_exc()
             return {
                 "response": "I can help you screen tenants. Please provide credit score, income, rent amount, employment status, and eviction record.",
@@ -1771,14 +1774,13 @@ def conversational_engine(conversation_history, user_message, last_candidate_fie
         print(f"[BASIC_ENGINE] Processing maintenance prediction intent (secondary path)")
         try:
             handler = MaintenancePredictionHandler()
-            result = handler.handle(conversation_history, user_message, last_candidate_fields)
+            result = handler.handle(conversation_history, user_message, last_candidate_fields, last_assistant_content)
             if result.get("action") == "maintenance_prediction" or result.get("action") == "maintenance_alerts":
                 intent_completed = True
             print(f"[BASIC_ENGINE] Maintenance prediction completed with action: {result.get('action')}")
             return {**result, "last_intent": intent if not intent_completed else None, "intent_completed": intent_completed}
         except Exception as e:
             print(f"[BASIC_ENGINE] ERROR: Maintenance prediction handler failed: {e}")
-            import traceback
             traceback.print_exc()
             return {
                 "response": (
@@ -1821,10 +1823,7 @@ def llm_web_compare(pred, rent_range):
     """
     Use LLM to search the web for similar rental listings and compare to prediction.
     """
-    from langchain_openai import ChatOpenAI
-    from langchain_core.messages import HumanMessage
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    llm = ChatOpenAI(model="gpt-4", temperature=0.3, openai_api_key=openai_api_key)
+    llm = get_chat("gpt-4", 0.3)
     prompt = f"""
 You are a real estate assistant. Search the web for 3–5 recent rental listings similar to the following property:
 
@@ -1929,16 +1928,18 @@ def migrate_existing_data_to_milvus():
 
 # --- Main Conversation Function (Use This in Django Backend) ---
 def handle_conversation(conversation_history, user_message, last_candidate_fields=None, 
-                       last_intent=None, intent_completed=False, session_id=None, user_id=None):
+                       last_intent=None, intent_completed=False, session_id=None, user_id=None,
+                       last_assistant_content=None):
     """
     Main conversation handler - automatically uses enhanced engine with Milvus when available,
     gracefully falls back to original engine if needed.
     
+    Pass last_assistant_content when the caller tracks the latest assistant reply (the websocket
+    session does); otherwise handlers find it by scanning conversation_history.
+    
     This is the function your Django backend should call.
     This function is designed to NEVER crash, no matter what happens.
     """
-    import time
-    import traceback
     
     # Ultra-detailed logging for production debugging
     timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
@@ -1985,7 +1986,8 @@ def handle_conversation(conversation_history, user_message, last_candidate_field
             last_intent=last_intent,
             intent_completed=intent_completed,
             session_id=session_id,
-            user_id=user_id
+            user_id=user_id,
+            last_assistant_content=last_assistant_content
         )
         print(f"[ENHANCED_ENGINE] SUCCESS - Enhanced engine returned successfully")
         print(f"[ENHANCED_ENGINE] Result action: {result.get('action')}")
@@ -2019,7 +2021,8 @@ def handle_conversation(conversation_history, user_message, last_candidate_field
             user_message=user_message,
             last_candidate_fields=last_candidate_fields,
             last_intent=last_intent,
-            intent_completed=intent_completed
+            intent_completed=intent_completed,
+            last_assistant_content=last_assistant_content
         )
         print(f"[BASIC_ENGINE] SUCCESS - Basic engine returned successfully")
         print(f"[BASIC_ENGINE] Result action: {result.get('action')}")
@@ -2166,8 +2169,10 @@ def test_enhanced_features():
                 print(f"📋 Fields Collected: {list(result['fields'].keys())}")
             
             # Update conversation history
-            conversation_history.append({"role": "user", "content": msg})
-            conversation_history.append({"role": "assistant", "content": result.get('response', '')})
+            conversation_history.extend([
+                {"role": "user", "content": msg},
+                {"role": "assistant", "content": result.get('response', '')}
+            ])
             
         print("\n" + "=" * 60)
         print("\n✅ Enhanced features test completed successfully!")
@@ -2182,7 +2187,6 @@ def test_enhanced_features():
         
     except Exception as e:
         print(f"❌ Enhanced features test failed: {e}")
-        import traceback
         traceback.print_exc()
 
 def demo_greeting_intelligence():
@@ -138,8 +138,10 @@ def demo_enhanced_chatbot():
             print(f"📋 Fields Collected: {list(result['fields'].keys())}")
         
         # Update conversation state
-        conversation_history.append({"role": "user", "content": user_message})
-        conversation_history.append({"role": "assistant", "content": result['response']})
+        conversation_history.extend([
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": result['response']}
+        ])
         current_fields = result.get('fields', {})
         last_intent = result.get('last_intent')
         intent_completed = result.get('intent_completed', False)
@@ -1,6 +1,50 @@
 # AI Tenant Screening Logic
 # Simple rule-based model for initial version
 
+# Optional: compile the numeric scoring rules to native code when numba is installed
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+RECOMMENDATIONS = ("Accept", "Review", "Reject")
+
+# Employment status is passed to the numeric kernel as an int code (numba is slow on strings)
+EMPLOYMENT_CODES = {"employed": 1}
+
+
+@njit(cache=True)
+def _score_numeric(credit_score, income, rent, eviction_record, employment_code):
+    """
+    Numeric core of screen_tenant: returns (risk_score, index into RECOMMENDATIONS).
+    """
+    risk_score = 0
+    if credit_score < 600:
+        risk_score += 40
+    if income < 3 * rent:
+        risk_score += 40
+    if employment_code != 1:
+        risk_score += 10
+    if eviction_record:
+        risk_score += 30
+    if risk_score >= 60 or credit_score < 500 or eviction_record:
+        return risk_score, 2
+    elif risk_score >= 30:
+        return risk_score, 1
+    return risk_score, 0
+
+
+# Compile once at import so the first screening request doesn't pay the JIT cost
+_score_numeric(700, 3000.0, 1000.0, False, 1)
+
+
 def screen_tenant(credit_score, income, rent, employment_status, eviction_record):
     """
     Screen a tenant application using simple rule-based criteria.
@@ -23,41 +67,26 @@ def screen_tenant(credit_score, income, rent, employment_status, eviction_record
         employment_status (str): Employment status (e.g., 'employed', 'unemployed')
         eviction_record (bool): True if applicant has prior eviction, else False
     """
-    explanation = []
-    risk_score = 0
-    # Credit score rule
-    if credit_score < 600:
-        explanation.append(f"Credit score {credit_score} is below minimum (600).")
-        risk_score += 40
-    else:
-        explanation.append(f"Credit score {credit_score} meets minimum.")
-    # Income-to-rent rule
-    if income < 3 * rent:
-        explanation.append(f"Income (£{income}) is less than 3x rent (£{rent}).")
-        risk_score += 40
-    else:
-        explanation.append(f"Income (£{income}) is at least 3x rent (£{rent}).")
-    # Employment status
-    if employment_status.lower() != "employed":
-        explanation.append(f"Employment status is '{employment_status}'.")
-        risk_score += 10
-    else:
-        explanation.append("Employment status is employed.")
-    # Eviction record
-    if eviction_record:
-        explanation.append("Prior eviction record found.")
-        risk_score += 30
-    else:
-        explanation.append("No prior eviction record.")
-    # Recommendation
-    if risk_score >= 60 or credit_score < 500 or eviction_record:
-        recommendation = "Reject"
-    elif risk_score >= 30:
-        recommendation = "Review"
-    else:
-        recommendation = "Accept"
+    employment_code = EMPLOYMENT_CODES.get(employment_status.lower(), 0)
+    risk_score, category_idx = _score_numeric(
+        int(credit_score), float(income), float(rent), bool(eviction_record), employment_code
+    )
+    explanation = [
+        # Credit score rule
+        f"Credit score {credit_score} is below minimum (600)." if credit_score < 600
+        else f"Credit score {credit_score} meets minimum.",
+        # Income-to-rent rule
+        f"Income (£{income}) is less than 3x rent (£{rent})." if income < 3 * rent
+        else f"Income (£{income}) is at least 3x rent (£{rent}).",
+        # Employment status
+        f"Employment status is '{employment_status}'." if employment_code != 1
+        else "Employment status is employed.",
+        # Eviction record
+        "Prior eviction record found." if eviction_record
+        else "No prior eviction record.",
+    ]
     return {
-        "risk_score": risk_score,
-        "recommendation": recommendation,
+        "risk_score": int(risk_score),
+        "recommendation": RECOMMENDATIONS[category_idx],
         "explanation": "\n".join(explanation)
     }
@@ -0,0 +1,88 @@
+"""
+Shared HTTP setup for the API test scripts and their pytest fixtures (conftest.py):
+retry policy, pooled session, JSON helpers and the optional per-run DNS cache.
+"""
+
+import json
+import socket
+import sys
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+
+# Deployments the scripts talk to: Traefik-routed production, the app domain, and the backend on :8000
+PRODUCTION_URL = "https://srv889806.hstgr.cloud"
+APP_URL = "https://rentmind.hstgr.cloud"
+DIRECT_CHAT_URLS = [
+    "https://srv889806.hstgr.cloud:8000/api/chat/",
+    "http://srv889806.hstgr.cloud:8000/api/chat/",
+]
+
+# --pipelined is a load smoke test, not a conversation test: once the opening turn is answered the
+# remaining turns are sent concurrently with that turn's history only, so the server may see the
+# confirmation before the details. Use it to check the server holds up under overlapping requests.
+PIPELINED = "--pipelined" in sys.argv
+PIPELINED_NOTICE = "⚠️  --pipelined: load smoke test - follow-up turns overlap and may arrive out of order"
+
+# Optional: orjson serializes straight to bytes and parses noticeably faster than the stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def dumps_json(payload):
+    """Request body as UTF-8 JSON bytes (Content-Type is set on each call)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+
+def loads_json(content):
+    """Parse a response body (bytes) once."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+# Transient failures (429/5xx gateway errors, dropped connections) retry up to 3 times with
+# jittered exponential backoff (backoff_factor=0.5), honouring Retry-After; the last response is returned
+RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    backoff_jitter=0.5,
+    status_forcelist=[429, 502, 503, 504],
+    allowed_methods=["POST", "GET", "HEAD"],
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+
+
+def make_session(session=None):
+    """Mount the pooled, retrying adapter on `session` (a fresh requests.Session by default) and return it."""
+    if session is None:
+        session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=RETRY)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # Ask for every compression urllib3 can decode here (gzip/deflate, plus br/zstd when their libraries are installed)
+    session.headers.update(make_headers(accept_encoding=True))
+    return session
+
+
+# Resolve each host once per run: new pooled connections reuse the cached getaddrinfo answer
+_getaddrinfo = socket.getaddrinfo
+
+
+@lru_cache(maxsize=32)
+def cached_getaddrinfo(*args, **kwargs):
+    return _getaddrinfo(*args, **kwargs)
+
+
+def install_dns_cache():
+    """Route socket.getaddrinfo through the cache; for script entry points only (pytest uses the dns_cache fixture)."""
+    socket.getaddrinfo = cached_getaddrinfo
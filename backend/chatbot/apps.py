@@ -1,6 +1,35 @@
 from django.apps import AppConfig
+import importlib.util
+import sys
+import os
 
 
 class ChatbotConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chatbot'
+
+    def ready(self):
+        # Opt-in (WARM_MAINTENANCE_ALERTS=1): load the maintenance alert preprocessor/model once per worker at
+        # boot, for deployments that ship the alert models and score alerts in-process
+        if os.getenv('WARM_MAINTENANCE_ALERTS', '0') != '1':
+            return
+        alerts_paths = [
+            '/app/predictive_maintenance_ai/maintenance_alerts.py',  # Docker path
+            os.path.abspath(os.path.join(os.path.dirname(__file__), '../../predictive_maintenance_ai/maintenance_alerts.py'))  # Local path
+        ]
+        for alerts_path in alerts_paths:
+            if not os.path.exists(alerts_path):
+                continue
+            try:
+                spec = importlib.util.spec_from_file_location("maintenance_alerts", alerts_path)
+                maintenance_alerts = importlib.util.module_from_spec(spec)
+                sys.modules["maintenance_alerts"] = maintenance_alerts
+                spec.loader.exec_module(maintenance_alerts)
+                maintenance_alerts.get_preprocessor()
+                maintenance_alerts.get_transform_params()
+                maintenance_alerts.get_predictor()
+                print(f"[STARTUP] Maintenance alert model warmed from: {alerts_path}")
+            except Exception as e:
+                sys.modules.pop("maintenance_alerts", None)  # don't leave a half-initialized module behind
+                print(f"[STARTUP] Maintenance alert model warmup skipped: {e}")
+            break
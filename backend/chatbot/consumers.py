@@ -83,6 +83,9 @@ print(f"[STARTUP] Final status: chatbot_integration = {'✅ AVAILABLE' if chatbo
 print(f"[STARTUP] Import error: {import_error}")
 print(f"[STARTUP] Emergency fallback will be used if needed")
 
+# Cap per-connection history so long sessions don't grow without bound
+MAX_HISTORY_MESSAGES = 200
+
 def get_emergency_response(user_message):
     """Emergency fallback responses that never fail"""
     msg = user_message.strip().lower()
@@ -155,6 +158,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
         self.conversation_history = []  # Store conversation as a list of {role, content}
         self.candidate_fields = {}      # Persist candidate fields across turns
         self.last_rent_prediction = None  # Store last rent prediction per session
+        self.last_assistant_content = None  # Latest assistant reply, tracked as turns are appended
         await self.accept()
         print(f"[WEBSOCKET] Connection accepted successfully")
 
@@ -284,14 +288,10 @@ class ChatConsumer(AsyncWebsocketConsumer):
         # Add user message to conversation history
         self.conversation_history.append({"role": "user", "content": user_message})
         # Try to extract fields from the last assistant message (if any)
-        if self.conversation_history:
-            # Look for the last assistant message
-            for msg in reversed(self.conversation_history[:-1]):
-                if msg["role"] == "assistant":
-                    extracted = self.extract_fields_from_markdown(msg["content"])
-                    if extracted:
-                        self.candidate_fields.update(extracted)
-                    break
+        if self.last_assistant_content:
+            extracted = self.extract_fields_from_markdown(self.last_assistant_content)
+            if extracted:
+                self.candidate_fields.update(extracted)
         # Call the conversational engine with candidate fields and intent
         print(f"[WEBSOCKET] ===== CALLING CONVERSATIONAL ENGINE =====")
         print(f"[WEBSOCKET] chatbot_integration available: {chatbot_integration is not None}")
@@ -313,7 +313,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
                     user_message=user_message,
                     last_candidate_fields=self.candidate_fields,
                     last_intent=user_intent,  # Pass user intent if provided
-                    intent_completed=False
+                    intent_completed=False,
+                    last_assistant_content=self.last_assistant_content
                 )
                 print(f"[WEBSOCKET] Conversational engine completed successfully")
                 print(f"[DEBUG] Conversational engine result: {result.get('action', 'no_action')}")
@@ -345,6 +346,9 @@ class ChatConsumer(AsyncWebsocketConsumer):
         # Add assistant response to conversation history
         print(f"[WEBSOCKET] Adding response to conversation history")
         self.conversation_history.append({"role": "assistant", "content": result['response']})
+        self.last_assistant_content = result['response']
+        if len(self.conversation_history) > MAX_HISTORY_MESSAGES:
+            del self.conversation_history[:-MAX_HISTORY_MESSAGES]
         print(f"[WEBSOCKET] Conversation history now has {len(self.conversation_history)} messages")
         
         # Send response back to frontend
@@ -0,0 +1,58 @@
+"""
+Shared pytest fixtures for the API test scripts in this directory.
+
+The scripts still run standalone (python test_production_maintenance.py); under pytest their flow
+tests receive one pooled session for the whole run. With pytest-xdist installed, `pytest -n auto`
+spreads the independent flows across workers, each with its own session.
+
+The flows talk to deployed servers, so they are skipped unless RENTMIND_LIVE_TESTS=1.
+RENTMIND_BASE_URL, RENTMIND_APP_URL and RENTMIND_DIRECT_URL point them at other deployments.
+"""
+
+import os
+import socket
+
+import pytest
+
+from api_test_utils import APP_URL, DIRECT_CHAT_URLS, PRODUCTION_URL, cached_getaddrinfo, make_session
+
+
+@pytest.fixture(scope="session")
+def live():
+    """Skip unless network tests against the deployed servers were asked for."""
+    if os.getenv("RENTMIND_LIVE_TESTS") != "1":
+        pytest.skip("set RENTMIND_LIVE_TESTS=1 to run tests against the deployed servers")
+
+
+@pytest.fixture(scope="session")
+def dns_cache(live):
+    """Resolve each host once for the run; socket.getaddrinfo is restored afterwards."""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(socket, "getaddrinfo", cached_getaddrinfo)
+        yield
+
+
+@pytest.fixture(scope="session")
+def http_session(dns_cache):
+    """Keep-alive session with the same pool and retry policy the scripts use."""
+    session = make_session()
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def base_url():
+    """Production server behind Traefik (test_production_maintenance.py)."""
+    return os.getenv("RENTMIND_BASE_URL", PRODUCTION_URL).rstrip("/")
+
+
+@pytest.fixture(scope="session")
+def app_url():
+    """App domain (test_maintenance_api.py)."""
+    return os.getenv("RENTMIND_APP_URL", APP_URL).rstrip("/")
+
+
+@pytest.fixture(scope="session")
+def direct_chat_url():
+    """Chat endpoint on the backend's own port, bypassing Traefik (test_direct_backend.py)."""
+    return os.getenv("RENTMIND_DIRECT_URL", DIRECT_CHAT_URLS[0])
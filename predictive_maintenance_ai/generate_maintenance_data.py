@@ -1,35 +1,33 @@
 import pandas as pd
 import numpy as np
 from faker import Faker
-from datetime import datetime, timedelta
-import random
 import os
 
 fake = Faker('en_UK')
 
 # Set seed for reproducibility
 np.random.seed(42)
-random.seed(42)
 
 # --- 1. Property Metadata ---
-properties = []
+# Columns are drawn in bulk with NumPy; only the Faker text fields stay per-row.
+n_properties = 100
+property_ids = np.arange(1, n_properties + 1)
 cities = ['London', 'Manchester', 'Birmingham', 'Leeds', 'Bristol']
 construction_types = ['Victorian Brick', 'Post-War Concrete', 'Modern Timber Frame', 'Edwardian Stone']
 
-for i in range(1, 101):  # 100 properties
-    age = random.randint(5, 120)  # UK homes can be very old
-    properties.append({
-        'property_id': i,
-        'address': fake.street_address() + ', ' + random.choice(cities),
-        'age_years': age,
-        'construction_type': random.choice(construction_types),
-        'hvac_age': min(age, random.randint(5, 25)),  # HVAC usually newer than building
-        'plumbing_age': min(age, random.randint(10, 40)),
-        'roof_age': min(age, random.randint(5, 30)),
-        'last_inspection_date': fake.date_between(start_date='-2y', end_date='today').strftime('%Y-%m-%d')
-    })
-
-df_properties = pd.DataFrame(properties)
+ages = np.random.randint(5, 121, size=n_properties)  # UK homes can be very old
+inspection_dates = [fake.date_between(start_date='-2y', end_date='today') for _ in range(n_properties)]
+
+df_properties = pd.DataFrame({
+    'property_id': property_ids,
+    'address': [fake.street_address() + ', ' + city for city in np.random.choice(cities, size=n_properties)],
+    'age_years': ages,
+    'construction_type': np.random.choice(construction_types, size=n_properties),
+    'hvac_age': np.minimum(ages, np.random.randint(5, 26, size=n_properties)),  # HVAC usually newer than building
+    'plumbing_age': np.minimum(ages, np.random.randint(10, 41, size=n_properties)),
+    'roof_age': np.minimum(ages, np.random.randint(5, 31, size=n_properties)),
+    'last_inspection_date': [d.strftime('%Y-%m-%d') for d in inspection_dates]
+})
 
 # --- 2. Maintenance Logs ---
 maintenance_issues = [
@@ -38,25 +36,23 @@ maintenance_issues = [
 ]
 severity = ['Low', 'Medium', 'High', 'Critical']
 
-logs = []
-for pid in range(1, 101):
-    for _ in range(random.randint(1, 5)):  # 1-5 logs per property
-        issue_date = fake.date_between(
-            start_date=datetime.strptime(df_properties.loc[pid-1, 'last_inspection_date'], '%Y-%m-%d'),
-            end_date='today'
-        ).strftime('%Y-%m-%d')
-        logs.append({
-            'log_id': len(logs) + 1,
-            'property_id': pid,
-            'issue_type': random.choice(maintenance_issues),
-            'severity': random.choices(severity, weights=[0.3, 0.4, 0.2, 0.1])[0],
-            'date': issue_date,
-            'cost': round(random.uniform(50, 2000), 2),
-            'resolved': random.choice([True, False]),
-            'notes': fake.sentence()
-        })
-
-df_logs = pd.DataFrame(logs)
+log_counts = np.random.randint(1, 6, size=n_properties)  # 1-5 logs per property
+n_logs = int(log_counts.sum())
+log_property_idx = np.repeat(np.arange(n_properties), log_counts)
+
+df_logs = pd.DataFrame({
+    'log_id': np.arange(1, n_logs + 1),
+    'property_id': property_ids[log_property_idx],
+    'issue_type': np.random.choice(maintenance_issues, size=n_logs),
+    'severity': np.random.choice(severity, size=n_logs, p=[0.3, 0.4, 0.2, 0.1]),
+    'date': [
+        fake.date_between(start_date=inspection_dates[i], end_date='today').strftime('%Y-%m-%d')
+        for i in log_property_idx
+    ],
+    'cost': np.round(np.random.uniform(50, 2000, size=n_logs), 2),
+    'resolved': np.random.choice([True, False], size=n_logs),
+    'notes': [fake.sentence() for _ in range(n_logs)]
+})
 
 # --- 3. Tenant Reports ---
 tenant_issues = [
@@ -64,75 +60,81 @@ tenant_issues = [
     'Mould Growth', 'Toilet Blocked', 'Fuse Tripped'
 ]
 
-reports = []
-for pid in range(1, 101):
-    for _ in range(random.randint(0, 3)):  # 0-3 reports per property
-        reports.append({
-            'report_id': len(reports) + 1,
-            'property_id': pid,
-            'issue_reported': random.choice(tenant_issues),
-            'date': fake.date_between(start_date='-6m', end_date='today').strftime('%Y-%m-%d'),
-            'urgency': random.randint(1, 5),
-            'status': random.choice(['Pending', 'Resolved', 'Investigating'])
-        })
+report_counts = np.random.randint(0, 4, size=n_properties)  # 0-3 reports per property
+n_reports = int(report_counts.sum())
 
-df_reports = pd.DataFrame(reports)
+df_reports = pd.DataFrame({
+    'report_id': np.arange(1, n_reports + 1),
+    'property_id': np.repeat(property_ids, report_counts),
+    'issue_reported': np.random.choice(tenant_issues, size=n_reports),
+    'date': [fake.date_between(start_date='-6m', end_date='today').strftime('%Y-%m-%d') for _ in range(n_reports)],
+    'urgency': np.random.randint(1, 6, size=n_reports),
+    'status': np.random.choice(['Pending', 'Resolved', 'Investigating'], size=n_reports)
+})
 
 # --- 4. Seasonal/Risk Factors ---
 months = ['January', 'February', 'March', 'April', 'May', 'June',
           'July', 'August', 'September', 'October', 'November', 'December']
-seasonal_data = []
-
-for pid in range(1, 101):
-    for month in months:
-        avg_temp = random.randint(2, 22)  # UK temps in °C
-        rainfall = round(random.uniform(0.5, 5.0), 1)  # Rainfall in mm
-        # Lower probability of high/medium risk for more realistic data
-        rand_val = random.random()
-        if rand_val < 0.05:  # 5% chance of high risk
-            risk_score = random.randint(8, 10)
-        elif rand_val < 0.20:  # 15% chance of medium risk
-            risk_score = random.randint(5, 7)
-        else:  # 80% chance of low risk
-            risk_score = random.randint(1, 4)
-        seasonal_data.append({
-            'property_id': pid,
-            'month': month,
-            'avg_temp_c': avg_temp,
-            'rainfall_mm': rainfall,
-            'pest_alert': random.choices(['None', 'Rodents', 'Damp Woodlice', 'Wasps'], weights=[0.7, 0.1, 0.1, 0.1])[0],
-            'maintenance_risk_score': risk_score
-        })
-
-df_seasonal = pd.DataFrame(seasonal_data)
+n_seasonal = n_properties * len(months)
+
+# Lower probability of high/medium risk for more realistic data:
+# 5% high (8-10), 15% medium (5-7), 80% low (1-4)
+rand_val = np.random.random(size=n_seasonal)
+risk_score = np.where(
+    rand_val < 0.05, np.random.randint(8, 11, size=n_seasonal),
+    np.where(rand_val < 0.20, np.random.randint(5, 8, size=n_seasonal),
+             np.random.randint(1, 5, size=n_seasonal))
+)
+
+df_seasonal = pd.DataFrame({
+    'property_id': np.repeat(property_ids, len(months)),
+    'month': np.tile(months, n_properties),
+    'avg_temp_c': np.random.randint(2, 23, size=n_seasonal),  # UK temps in °C
+    'rainfall_mm': np.round(np.random.uniform(0.5, 5.0, size=n_seasonal), 1),  # Rainfall in mm
+    'pest_alert': np.random.choice(['None', 'Rodents', 'Damp Woodlice', 'Wasps'], size=n_seasonal, p=[0.7, 0.1, 0.1, 0.1]),
+    'maintenance_risk_score': risk_score
+})
 
 # --- 5. IoT Sensor Data (Optional) ---
 sensor_types = ['Water Flow', 'Boiler Pressure', 'CO2', 'Humidity']
-sensor_data = []
-
-for pid in range(1, 101):
-    for _ in range(random.randint(1, 3)):  # 1-3 sensors per property
-        sensor_type = random.choice(sensor_types)
-        reading = str(round(random.uniform(0, 100), 2)) + (
-            ' gal/hr' if 'Water' in sensor_type else 
-            ' psi' if 'Pressure' in sensor_type else 
-            ' ppm' if 'CO2' in sensor_type else '%'
-        )
-        sensor_data.append({
-            'property_id': pid,
-            'sensor_type': sensor_type,
-            'reading': reading,
-            'timestamp': fake.date_time_between(start_date='-1m', end_date='now').strftime('%Y-%m-%d %H:%M:%S'),
-            'alert_triggered': random.choice([True, False])
-        })
-
-df_sensors = pd.DataFrame(sensor_data)
-
-# --- Export to CSV ---
+
+sensor_counts = np.random.randint(1, 4, size=n_properties)  # 1-3 sensors per property
+n_sensors = int(sensor_counts.sum())
+sensor_type = np.random.choice(sensor_types, size=n_sensors)
+sensor_unit = np.select(
+    [np.char.find(sensor_type, 'Water') >= 0,
+     np.char.find(sensor_type, 'Pressure') >= 0,
+     np.char.find(sensor_type, 'CO2') >= 0],
+    [' gal/hr', ' psi', ' ppm'],
+    default='%'
+)
+sensor_values = np.round(np.random.uniform(0, 100, size=n_sensors), 2).astype(str)
+
+df_sensors = pd.DataFrame({
+    'property_id': np.repeat(property_ids, sensor_counts),
+    'sensor_type': sensor_type,
+    'reading': np.char.add(sensor_values, sensor_unit),
+    'timestamp': [
+        fake.date_time_between(start_date='-1m', end_date='now').strftime('%Y-%m-%d %H:%M:%S')
+        for _ in range(n_sensors)
+    ],
+    'alert_triggered': np.random.choice([True, False], size=n_sensors)
+})
+
+# --- Export to CSV (+ Parquet) ---
 data_dir = 'data/'
 os.makedirs(data_dir, exist_ok=True)
 df_properties.to_csv(data_dir + 'uk_properties.csv', index=False)
 df_logs.to_csv(data_dir + 'uk_maintenance_logs.csv', index=False)
 df_reports.to_csv(data_dir + 'uk_tenant_reports.csv', index=False)
 df_seasonal.to_csv(data_dir + 'uk_seasonal_risks.csv', index=False)
-df_sensors.to_csv(data_dir + 'uk_iot_sensors.csv', index=False)
\ No newline at end of file
+df_sensors.to_csv(data_dir + 'uk_iot_sensors.csv', index=False)
+
+# Typed Parquet copies next to the CSVs; preprocess_data.py reads these when they are current
+try:
+    for name, frame in [('uk_properties', df_properties), ('uk_maintenance_logs', df_logs),
+                        ('uk_tenant_reports', df_reports), ('uk_seasonal_risks', df_seasonal),
+                        ('uk_iot_sensors', df_sensors)]:
+        frame.to_parquet(data_dir + name + '.parquet', index=False)
+except ImportError:
+    print("pyarrow not installed, skipping Parquet export")
@@ -1,93 +1,126 @@
 import pandas as pd
 import numpy as np
-import random
 import os
-from datetime import datetime, timedelta
+import importlib.util
+from datetime import datetime
+
+# Optional: use Polars' multithreaded CSV reader/writer when it is installed
+try:
+    import polars as pl
+    POLARS_AVAILABLE = importlib.util.find_spec('pyarrow') is not None  # Polars needs it for pandas interchange
+except ImportError:
+    POLARS_AVAILABLE = False
+
+
+def read_csv(path):
+    if POLARS_AVAILABLE:
+        return pl.read_csv(path).to_pandas()
+    return pd.read_csv(path)
+
+
+def write_table(df, path):
+    """Write the CSV plus a typed Parquet copy next to it for the training scripts."""
+    parquet_path = os.path.splitext(path)[0] + '.parquet'
+    if POLARS_AVAILABLE:
+        frame = pl.from_pandas(df)
+        frame.write_csv(path)
+        frame.write_parquet(parquet_path)
+    else:
+        df.to_csv(path, index=False)
+        try:
+            df.to_parquet(parquet_path, index=False)
+        except ImportError:
+            pass  # no Parquet engine installed; the CSV alone is enough
+
 
 # --- Load Rent Pricing Properties (for address sync) ---
 rent_data_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../Rent_Pricing_AI/data/cleaned_rent_data.csv'))
-rent_df = pd.read_csv(rent_data_path)
+rent_df = read_csv(rent_data_path)
 
 
 # Use every row in rent data (not just unique addresses)
 property_rows = rent_df.reset_index(drop=True)
 
 # --- 1. Property Metadata ---
-properties = []
+# Every column is drawn for all rows at once into a narrow-typed array; child tables expand
+# property ids with np.repeat. Frames wrap those arrays without copying (copy=False) and
+# repeated labels are stored as categoricals, so peak memory stays close to the output size.
+n = len(property_rows)
+rng = np.random.default_rng(42)  # one seeded Generator for every draw below
+property_ids = property_rows['address'].values
 cities = ['London', 'Manchester', 'Birmingham', 'Leeds', 'Bristol']
 construction_types = ['Victorian Brick', 'Post-War Concrete', 'Modern Timber Frame', 'Edwardian Stone']
+seasons = ['Winter', 'Spring', 'Summer', 'Autumn']
+
+
+def choice_category(values, size):
+    """Uniform draw from values, stored as int8 codes plus the label list."""
+    return pd.Categorical.from_codes(rng.integers(0, len(values), size=size, dtype=np.int8), categories=values)
+
 
-for idx, row in property_rows.iterrows():
-    pid = row['address']
-    age = np.random.randint(5, 120)
-    properties.append({
-        'property_id': pid,
-        'address': str(pid),  # Use address exactly as in rent data
-        'age_years': age,
-        'construction_type': random.choice(construction_types),
-        'last_service_years_ago': np.random.randint(0, 10),
-        'seasonality': random.choice(['Winter', 'Spring', 'Summer', 'Autumn'])
-    })
+df_properties = pd.DataFrame({
+    'property_id': property_ids,
+    # Use address exactly as in rent data; kept numeric so the Parquet copy has the same dtype the
+    # CSV reads back as, matching the int-encoded addresses the chatbot sends at inference
+    'address': property_rows['address'].values,
+    'age_years': rng.integers(5, 120, size=n, dtype=np.int16),
+    'construction_type': choice_category(construction_types, n),
+    'last_service_years_ago': rng.integers(0, 10, size=n, dtype=np.int8),
+    'seasonality': choice_category(seasons, n)
+}, copy=False)
 
-df_properties = pd.DataFrame(properties)
+today = np.datetime64(datetime.now().date(), 'D')
 
 # --- 2. Maintenance Logs (for training) ---
-logs = []
-for idx, row in property_rows.iterrows():
-    pid = row['address']
-    # Ensure at least one log per property row
-    for _ in range(1, np.random.randint(2, 4)):
-        logs.append({
-            'property_id': pid,
-            'date': (datetime.now() - timedelta(days=np.random.randint(30, 365*3))).strftime('%Y-%m-%d'),
-            'issue_type': random.choice(['Boiler Failure', 'Damp/Mould', 'Roof Leak', 'Electrical Fault']),
-            'severity': random.choice(['Low', 'Medium', 'High']),
-            'resolved': random.choice([True, False])
-        })
-df_logs = pd.DataFrame(logs)
+# Ensure at least one log per property row (1-2 each)
+log_counts = rng.integers(2, 4, size=n) - 1
+n_logs = int(log_counts.sum())
+df_logs = pd.DataFrame({
+    'property_id': np.repeat(property_ids, log_counts),
+    'date': np.datetime_as_string(today - rng.integers(30, 365*3, size=n_logs, dtype=np.int16), unit='D'),
+    'issue_type': choice_category(['Boiler Failure', 'Damp/Mould', 'Roof Leak', 'Electrical Fault'], n_logs),
+    'severity': choice_category(['Low', 'Medium', 'High'], n_logs),
+    'resolved': rng.integers(0, 2, size=n_logs).astype(bool)
+}, copy=False)
 
 # --- 3. Tenant Reports (for training) ---
-reports = []
-for idx, row in property_rows.iterrows():
-    pid = row['address']
-    # Ensure at least one report per property row
-    for _ in range(1, np.random.randint(2, 4)):
-        reports.append({
-            'property_id': pid,
-            'date': (datetime.now() - timedelta(days=np.random.randint(1, 365))).strftime('%Y-%m-%d'),
-            'issue_reported': random.choice(['No Heating', 'Damp Patch', 'Leaking Tap', 'Broken Lock']),
-            'urgency': np.random.randint(1, 6)
-        })
-df_reports = pd.DataFrame(reports)
+# Ensure at least one report per property row (1-2 each)
+report_counts = rng.integers(2, 4, size=n) - 1
+n_reports = int(report_counts.sum())
+df_reports = pd.DataFrame({
+    'property_id': np.repeat(property_ids, report_counts),
+    'date': np.datetime_as_string(today - rng.integers(1, 365, size=n_reports, dtype=np.int16), unit='D'),
+    'issue_reported': choice_category(['No Heating', 'Damp Patch', 'Leaking Tap', 'Broken Lock'], n_reports),
+    'urgency': rng.integers(1, 6, size=n_reports, dtype=np.int8)
+}, copy=False)
 
 # --- 4. Seasonality (for training) ---
-seasonal = []
-for idx, row in property_rows.iterrows():
-    pid = row['address']
-    for season in ['Winter', 'Spring', 'Summer', 'Autumn']:
-        seasonal.append({
-            'property_id': pid,
-            'season': season,
-            'avg_temp_c': np.random.randint(2, 22),
-            'rainfall_mm': round(np.random.uniform(0.5, 5.0), 1),
-            'maintenance_risk_score': np.random.randint(1, 10)
-        })
-df_seasonal = pd.DataFrame(seasonal)
+n_seasonal = n * len(seasons)
+df_seasonal = pd.DataFrame({
+    'property_id': np.repeat(property_ids, len(seasons)),
+    'season': pd.Categorical.from_codes(np.tile(np.arange(len(seasons), dtype=np.int8), n), categories=seasons),
+    'avg_temp_c': rng.integers(2, 22, size=n_seasonal, dtype=np.int8),
+    'rainfall_mm': np.round(rng.uniform(0.5, 5.0, size=n_seasonal), 1),
+    'maintenance_risk_score': rng.integers(1, 10, size=n_seasonal, dtype=np.int8)
+}, copy=False)
 
 # --- 5. Model Input/Output Example (for inference) ---
 # Input: address, age, last_service_years_ago, seasonality
 # Output: risk_score, recommended_action
 model_inputs = df_properties[['address', 'age_years', 'last_service_years_ago', 'seasonality']].copy()
-model_inputs['risk_score'] = np.random.randint(1, 10, size=len(model_inputs))
-model_inputs['recommended_action'] = model_inputs['risk_score'].apply(lambda x: 'Immediate Action' if x > 7 else ('Monitor' if x > 4 else 'Routine'))
+model_inputs['risk_score'] = rng.integers(1, 10, size=len(model_inputs))
+model_inputs['recommended_action'] = pd.cut(
+    model_inputs['risk_score'], bins=[0, 4, 7, 10],
+    labels=['Routine', 'Monitor', 'Immediate Action'], include_lowest=True
+)
 
 # Ensure all output files have exactly the same number of rows as rent data
 assert len(model_inputs) == len(property_rows) == 3478, f"Expected 3478 rows, got {len(model_inputs)}"
-# --- Export to CSV ---
+# --- Export to CSV (+ Parquet) ---
 data_dir = os.path.join(os.path.dirname(__file__), 'data/')
 os.makedirs(data_dir, exist_ok=True)
-df_properties.to_csv(os.path.join(data_dir, 'uk_properties.csv'), index=False)
-df_logs.to_csv(os.path.join(data_dir, 'uk_maintenance_logs.csv'), index=False)
-df_reports.to_csv(os.path.join(data_dir, 'uk_tenant_reports.csv'), index=False)
-df_seasonal.to_csv(os.path.join(data_dir, 'uk_seasonal_risks.csv'), index=False)
-model_inputs.to_csv(os.path.join(data_dir, 'maintenance_model_inputs_outputs.csv'), index=False)
+write_table(df_properties, os.path.join(data_dir, 'uk_properties.csv'))
+write_table(df_logs, os.path.join(data_dir, 'uk_maintenance_logs.csv'))
+write_table(df_reports, os.path.join(data_dir, 'uk_tenant_reports.csv'))
+write_table(df_seasonal, os.path.join(data_dir, 'uk_seasonal_risks.csv'))
+write_table(model_inputs, os.path.join(data_dir, 'maintenance_model_inputs_outputs.csv'))
@@ -1,40 +1,42 @@
 # In your maintenance_alerts.py
 import pandas as pd
+import numpy as np
+import xgboost as xgb
 import joblib
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
-# Load CORRECT preprocessor and model
-MODEL_DIR = os.path.join(os.path.dirname(__file__), 'models')
-preprocessor = joblib.load(os.path.join(MODEL_DIR, 'preprocessor.pkl'))
-clf = joblib.load(os.path.join(MODEL_DIR, 'xgb_model.pkl'))
+# Shared table schemas live next to this file; it is also loaded by path (backend/chatbot/apps.py)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from maintenance_tables import CSV_SOURCES, read_table
+
+# Optional: Treelite-compiled model runtime (see train_xgb_model.py)
+try:
+    import tl2cgen
+    TL2CGEN_AVAILABLE = True
+except ImportError:
+    TL2CGEN_AVAILABLE = False
+
+# Optional: numba kernel for bucketing risk scores on large batches
+try:
+    from numba import guvectorize, float32, int8
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
-# Load your data (add this before feature_cols and X)
+MODEL_DIR = os.path.join(os.path.dirname(__file__), 'models')
+COMPILED_MODEL_PATH = os.path.join(MODEL_DIR, 'xgb_model.so')
+TRANSFORM_PARAMS_PATH = os.path.join(MODEL_DIR, 'preprocessor_params.npz')
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
-properties = pd.read_csv(os.path.join(DATA_DIR, 'uk_properties.csv'))
-logs = pd.read_csv(os.path.join(DATA_DIR, 'uk_maintenance_logs.csv'))
-reports = pd.read_csv(os.path.join(DATA_DIR, 'uk_tenant_reports.csv'))
-seasonal = pd.read_csv(os.path.join(DATA_DIR, 'uk_seasonal_risks.csv'))
-
-# Feature engineering (same as in preprocessing)
-logs['is_urgent'] = logs['severity'].apply(lambda x: 1 if x in ['High', 'Critical'] else 0)
-reports['is_open'] = reports['status'].apply(lambda x: 1 if x != 'Resolved' else 0)
-df = properties.merge(
-    logs.groupby('property_id').agg(
-        total_incidents=('log_id', 'count'),
-        urgent_incidents=('is_urgent', 'sum')
-    ), on='property_id', how='left'
-).merge(
-    reports.groupby('property_id').agg(
-        open_issues=('is_open', 'sum')
-    ), on='property_id', how='left'
-).merge(
-    seasonal[seasonal['month'] == 'June'][['property_id', 'maintenance_risk_score']],
-    on='property_id', how='left'
-)
-df = df.fillna(0)
+
+# Prediction threads per process. When serving with many workers, prefer more workers with
+# MAINTENANCE_PREDICT_THREADS=1 each; unset uses OMP_NUM_THREADS, or all cores if that is unset too.
+PREDICT_THREADS = int(os.getenv('MAINTENANCE_PREDICT_THREADS') or os.getenv('OMP_NUM_THREADS') or 0) or None
 
 # Define the SAME features used in training
-feature_cols = [
+FEATURE_COLS = [
     'construction_type',
     'age_years',
     'hvac_age',
@@ -44,39 +46,165 @@ feature_cols = [
     'urgent_incidents',
     'open_issues'
 ]
+NUMERIC_COLS = FEATURE_COLS[1:]
 
-# Process and predict
-X = df[feature_cols].copy()
-X_processed = preprocessor.transform(X)
-risk_scores = clf.predict(X_processed)
-df['predicted_risk_score'] = risk_scores
-
-# Map risk scores to action labels
-bins = [0, 4.5, 7.5, 10]
-action_labels = [
+# Map risk scores to action labels: (.., 4.5] -> 0, (4.5, 7.5] -> 1, (7.5, ..) -> 2
+RISK_THRESHOLDS = np.array([4.5, 7.5], dtype=np.float32)
+ACTION_LABELS = [
     'Routine monitoring',
     'Schedule maintenance soon',
     'Immediate inspection and preventive maintenance required'
 ]
-df['predicted_action'] = pd.cut(df['predicted_risk_score'], bins=bins, labels=action_labels, include_lowest=True)
+# Action codes at or above this one raise an alert
+ALERT_MIN_CODE = ACTION_LABELS.index('Schedule maintenance soon')
 
-# Print prediction distribution for debugging
-print('Prediction distribution:')
-print(df['predicted_action'].value_counts())
 
-# Generate alerts
-alert_actions = [
-    'Immediate inspection and preventive maintenance required',
-    'Schedule maintenance soon'
-]
-alerts = df[df['predicted_action'].isin(alert_actions)]
+if NUMBA_AVAILABLE:
+    @guvectorize([(float32[:], int8[:])], '(n)->(n)', nopython=True, target='parallel')
+    def _classify_kernel(x, out):
+        # Same buckets as RISK_THRESHOLDS, NaN -> 0 as in the NumPy path
+        for i in range(x.shape[0]):
+            if np.isnan(x[i]):
+                out[i] = 0
+            else:
+                out[i] = 2 if x[i] > 7.5 else (1 if x[i] > 4.5 else 0)
+
+
+def classify_risk(risk_scores):
+    """Map risk scores to int8 indices into ACTION_LABELS. NaN scores map to 0 and never raise an alert."""
+    x = np.asarray(risk_scores, dtype=np.float32)
+    if NUMBA_AVAILABLE:
+        return _classify_kernel(x)
+    # searchsorted sorts NaN past every threshold, so it is mapped to 0 explicitly
+    return np.where(np.isnan(x), 0, np.searchsorted(RISK_THRESHOLDS, x)).astype(np.int8)
+
+
+# Load CORRECT preprocessor and model once per process; importers (e.g. the Django app) reuse them
+@lru_cache(maxsize=1)
+def get_preprocessor():
+    return joblib.load(os.path.join(MODEL_DIR, 'preprocessor.pkl'))
+
+
+@lru_cache(maxsize=1)
+def get_predictor():
+    """
+    Treelite-compiled predictor when available and built from the current model (not older than
+    xgb_model.pkl), otherwise the pickled model's XGBoost booster.
+    """
+    model_path = os.path.join(MODEL_DIR, 'xgb_model.pkl')
+    if TL2CGEN_AVAILABLE and os.path.exists(COMPILED_MODEL_PATH) and (
+            not os.path.exists(model_path) or os.path.getmtime(COMPILED_MODEL_PATH) >= os.path.getmtime(model_path)):
+        return tl2cgen.Predictor(COMPILED_MODEL_PATH, nthread=PREDICT_THREADS)
+    booster = joblib.load(model_path).get_booster()
+    if PREDICT_THREADS:
+        booster.set_param({'nthread': PREDICT_THREADS})
+    return booster
+
+
+@lru_cache(maxsize=1)
+def get_transform_params():
+    """Fitted one-hot categories exported by preprocess_data.py (None if not exported)."""
+    if not os.path.exists(TRANSFORM_PARAMS_PATH):
+        return None
+    with np.load(TRANSFORM_PARAMS_PATH, allow_pickle=False) as params:
+        return params['categories']
+
+
+def transform_features(X):
+    """
+    Same output as preprocessor.transform (one-hot construction_type, then the raw numerics), computed
+    directly in NumPy. Falls back to the sklearn preprocessor when no exported parameters exist or a
+    construction_type was not seen during fitting.
+    """
+    categories = get_transform_params()
+    if categories is None:
+        return get_preprocessor().transform(X)
+    cat_idx = pd.Categorical(X['construction_type'], categories=categories).codes
+    if (cat_idx < 0).any():
+        return get_preprocessor().transform(X)
+    X_processed = np.zeros((len(X), len(categories) + len(NUMERIC_COLS)), dtype=np.float32)
+    X_processed[np.arange(len(X)), cat_idx] = 1
+    X_processed[:, len(categories):] = X[NUMERIC_COLS].to_numpy(np.float32)
+    return X_processed
+
+
+def predict_risk(X_processed):
+    """Score the whole batch in one DMatrix call over a contiguous float32 matrix."""
+    if hasattr(X_processed, 'toarray'):
+        X_processed = X_processed.toarray()
+    X = np.ascontiguousarray(X_processed, dtype=np.float32)
+    predictor = get_predictor()
+    if TL2CGEN_AVAILABLE and isinstance(predictor, tl2cgen.Predictor):
+        return predictor.predict(tl2cgen.DMatrix(X)).reshape(-1)
+    return predictor.predict(xgb.DMatrix(X, nthread=PREDICT_THREADS or -1), validate_features=False)
+
+
+def load_data(data_dir=DATA_DIR):
+    """Read the four tables concurrently (the CSV parsers release the GIL while decoding)."""
+    with ThreadPoolExecutor(max_workers=len(CSV_SOURCES)) as executor:
+        properties, logs, reports, seasonal = executor.map(
+            lambda source: read_table(os.path.join(data_dir, source[0]), source[1]),
+            CSV_SOURCES
+        )
+    return properties, logs, reports, seasonal
+
+
+def build_features(properties, logs, reports, seasonal):
+    # Feature engineering (same as in preprocessing)
+    logs = logs.assign(is_urgent=logs['severity'].isin(['High', 'Critical']).astype('int8'))
+    reports = reports.assign(is_open=(reports['status'].values != 'Resolved').astype('int8'))
+    # Aggregate first, then attach everything to properties in one multi-way join on the index
+    # property_id as a Categorical over the known properties: both groupbys reuse one factorization, unsorted
+    property_ids = pd.CategoricalDtype(categories=properties['property_id'].unique())
+    logs = logs.assign(property_id=logs['property_id'].astype(property_ids))
+    reports = reports.assign(property_id=reports['property_id'].astype(property_ids))
+    logs_agg = logs.groupby('property_id', sort=False, observed=True).agg(
+        total_incidents=('log_id', 'count'),
+        urgent_incidents=('is_urgent', 'sum')
+    )
+    reports_agg = reports.groupby('property_id', sort=False, observed=True).agg(
+        open_issues=('is_open', 'sum')
+    )
+    june_risk = seasonal.loc[seasonal['month'] == 'June', ['property_id', 'maintenance_risk_score']].set_index('property_id')
+    df = properties.set_index('property_id').join(
+        [logs_agg, reports_agg, june_risk], how='left'
+    ).reset_index()
+    # Properties without logs/reports/June data get zeros (only the joined columns can be missing)
+    joined_cols = ['total_incidents', 'urgent_incidents', 'open_issues', 'maintenance_risk_score']
+    df[joined_cols] = df[joined_cols].fillna(0)
+    return df
+
+
+def score(properties, logs, reports, seasonal):
+    """
+    Run the feature pipeline and model over the given tables.
+    Returns the merged frame with predicted_risk_score and predicted_action columns.
+    """
+    df = build_features(properties, logs, reports, seasonal)
+    X_processed = transform_features(df[FEATURE_COLS])
+    df['predicted_risk_score'] = predict_risk(X_processed)
+    df['predicted_action'] = pd.Categorical.from_codes(classify_risk(df['predicted_risk_score']), categories=ACTION_LABELS)
+    return df
+
+
+if __name__ == '__main__':
+    df = score(*load_data())
+
+    # Print prediction distribution for debugging
+    print('Prediction distribution:')
+    print(df['predicted_action'].value_counts())
+
+    # Generate alerts
+    alerts = df[df['predicted_action'].cat.codes.to_numpy() >= ALERT_MIN_CODE]
 
-# Print alerts
-for _, row in alerts.iterrows():
-    print(f"\n🔔 [Maintenance Alert] {row['address']}")
-    print(f"Recommended Action: {row['predicted_action']}")
-    print(f"Risk Factors: Age {row['age_years']} yrs, Open Issues {int(row['open_issues'])}, Urgent Incidents {int(row['urgent_incidents'])}")
-    print(f"Last Inspection: {row['last_inspection_date']}")
-    print("---")
+    # Print alerts (formatted in one pass and written at once)
+    print("".join(
+        f"\n🔔 [Maintenance Alert] {row.address}\n"
+        f"Recommended Action: {row.predicted_action}\n"
+        f"Risk Factors: Age {row.age_years} yrs, Open Issues {int(row.open_issues)}, Urgent Incidents {int(row.urgent_incidents)}\n"
+        f"Last Inspection: {row.last_inspection_date}\n"
+        "---\n"
+        for row in alerts.itertuples(index=False)
+    ), end="")
 
-print(f"\nTotal alerts generated: {len(alerts)}")
\ No newline at end of file
+    print(f"\nTotal alerts generated: {len(alerts)}")
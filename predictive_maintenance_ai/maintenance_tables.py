@@ -0,0 +1,44 @@
+# Table schemas and readers shared by preprocess_data.py (training) and maintenance_alerts.py (scoring)
+import pandas as pd
+import os
+import importlib.util
+
+# Optional: PyArrow's multithreaded CSV parser, and Parquet copies of the tables
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+CSV_ENGINE = 'pyarrow' if PYARROW_AVAILABLE else 'c'
+
+# Explicit column types so the CSV reader skips type inference
+PROPERTIES_DTYPES = {
+    'property_id': 'int32', 'address': 'str', 'age_years': 'int16', 'construction_type': 'category',
+    'hvac_age': 'int16', 'plumbing_age': 'int16', 'roof_age': 'int16', 'last_inspection_date': 'str'
+}
+LOGS_DTYPES = {
+    'log_id': 'int32', 'property_id': 'int32', 'issue_type': 'category', 'severity': 'category',
+    'date': 'str', 'cost': 'float64', 'resolved': 'bool', 'notes': 'str'
+}
+REPORTS_DTYPES = {
+    'report_id': 'int32', 'property_id': 'int32', 'issue_reported': 'category', 'date': 'str',
+    'urgency': 'int8', 'status': 'category'
+}
+SEASONAL_DTYPES = {
+    'property_id': 'int32', 'month': 'category', 'avg_temp_c': 'int8', 'rainfall_mm': 'float64',
+    'pest_alert': 'category', 'maintenance_risk_score': 'int8'
+}
+
+# The four input tables, in the order callers unpack them: properties, logs, reports, seasonal
+CSV_SOURCES = [
+    ('uk_properties.csv', PROPERTIES_DTYPES),
+    ('uk_maintenance_logs.csv', LOGS_DTYPES),
+    ('uk_tenant_reports.csv', REPORTS_DTYPES),
+    ('uk_seasonal_risks.csv', SEASONAL_DTYPES)
+]
+
+
+def read_table(path, dtype):
+    """Parquet copy of a CSV table when it is at least as new as the CSV, otherwise the CSV itself."""
+    parquet_path = os.path.splitext(path)[0] + '.parquet'
+    if PYARROW_AVAILABLE and os.path.exists(parquet_path) and (
+            not os.path.exists(path) or os.path.getmtime(parquet_path) >= os.path.getmtime(path)):
+        df = pd.read_parquet(parquet_path, engine='pyarrow')
+        return df.astype({col: t for col, t in dtype.items() if col in df.columns})
+    return pd.read_csv(path, dtype=dtype, engine=CSV_ENGINE)
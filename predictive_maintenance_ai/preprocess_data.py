@@ -1,42 +1,50 @@
 # Preprocessing and Feature Engineering for Predictive Maintenance AI
 import pandas as pd
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+import numpy as np
+from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
 import os
 import joblib
+from concurrent.futures import ThreadPoolExecutor
+from maintenance_tables import CSV_SOURCES, PYARROW_AVAILABLE, read_table
 
 # Create directories if they don't exist
 os.makedirs('data', exist_ok=True)
 os.makedirs('models', exist_ok=True)
 
-# Load data from data subfolder
+# Load data from data subfolder (the four files are read concurrently; the CSV parsers release the GIL)
 data_dir = 'data/'
-properties = pd.read_csv(os.path.join(data_dir, 'uk_properties.csv'))
-logs = pd.read_csv(os.path.join(data_dir, 'uk_maintenance_logs.csv'))
-reports = pd.read_csv(os.path.join(data_dir, 'uk_tenant_reports.csv'))
-seasonal = pd.read_csv(os.path.join(data_dir, 'uk_seasonal_risks.csv'))
+with ThreadPoolExecutor(max_workers=len(CSV_SOURCES)) as executor:
+    properties, logs, reports, seasonal = executor.map(
+        lambda source: read_table(os.path.join(data_dir, source[0]), source[1]),
+        CSV_SOURCES
+    )
 
 # Feature engineering
-logs['is_urgent'] = logs['severity'].apply(lambda x: 1 if x in ['High', 'Critical'] else 0)
-reports['is_open'] = reports['status'].apply(lambda x: 1 if x != 'Resolved' else 0)
+logs['is_urgent'] = logs['severity'].isin(['High', 'Critical']).astype('int8')
+reports['is_open'] = (reports['status'].values != 'Resolved').astype('int8')
 
 # Merge datasets (example: focus on June for seasonal risk)
-df = properties.merge(
-    logs.groupby('property_id').agg(
-        total_incidents=('log_id', 'count'),
-        urgent_incidents=('is_urgent', 'sum')
-    ), on='property_id', how='left'
-).merge(
-    reports.groupby('property_id').agg(
-        open_issues=('is_open', 'sum')
-    ), on='property_id', how='left'
-).merge(
-    seasonal[seasonal['month'] == 'June'][['property_id', 'maintenance_risk_score']],
-    on='property_id', how='left'
+# Aggregate first, then attach everything to properties in one multi-way join on the index
+# property_id as a Categorical over the known properties: both groupbys reuse one factorization, unsorted
+property_ids = pd.CategoricalDtype(categories=properties['property_id'].unique())
+logs['property_id'] = logs['property_id'].astype(property_ids)
+reports['property_id'] = reports['property_id'].astype(property_ids)
+logs_agg = logs.groupby('property_id', sort=False, observed=True).agg(
+    total_incidents=('log_id', 'count'),
+    urgent_incidents=('is_urgent', 'sum')
 )
+reports_agg = reports.groupby('property_id', sort=False, observed=True).agg(
+    open_issues=('is_open', 'sum')
+)
+june_risk = seasonal.loc[seasonal['month'] == 'June', ['property_id', 'maintenance_risk_score']].set_index('property_id')
+df = properties.set_index('property_id').join(
+    [logs_agg, reports_agg, june_risk], how='left'
+).reset_index()
 
-# Fill missing values (if any)
-df = df.fillna(0)
+# Fill missing values (if any) - only the joined columns can be missing
+joined_cols = ['total_incidents', 'urgent_incidents', 'open_issues', 'maintenance_risk_score']
+df[joined_cols] = df[joined_cols].fillna(0)
 
 # Define the correct feature columns (excluding metadata)
 feature_cols = [
@@ -50,30 +58,40 @@ feature_cols = [
     'open_issues'        # numeric
 ]
 
+numeric_cols = [col for col in feature_cols if col != 'construction_type']
+
+# Narrow dtypes: counts/ages fit in int32 and construction_type has a handful of values
+df[numeric_cols] = df[numeric_cols].astype(np.int32)
+df['construction_type'] = df['construction_type'].astype('category')
+
 # Create preprocessor that only uses the correct features
+# Trees split on raw thresholds, so numerics pass through unscaled; both branches emit float32
+# (what XGBoost uses internally) and the output is a dense matrix
 preprocessor = ColumnTransformer(
     transformers=[
-        ('cat', OneHotEncoder(), ['construction_type']),
-        ('num', StandardScaler(), [col for col in feature_cols if col != 'construction_type'])
+        ('cat', OneHotEncoder(dtype=np.float32, sparse_output=False), ['construction_type']),
+        ('num', 'passthrough', numeric_cols)
     ],
     remainder='drop'  # This ensures ONLY specified columns are processed
 )
 
-# Process features
-X = df[feature_cols]
+# Process features (numerics handed over as float32 so the stacked matrix stays float32)
+X = df[feature_cols].astype({col: np.float32 for col in numeric_cols})
 y = df['maintenance_risk_score']  # Target variable
 X_processed = preprocessor.fit_transform(X)
 
 # Get feature names after transformation
 cat_features = preprocessor.named_transformers_['cat'].get_feature_names_out(['construction_type'])
-num_features = [col for col in feature_cols if col != 'construction_type']
-feature_names = list(cat_features) + num_features
+feature_names = list(cat_features) + numeric_cols
 
 # Verify shape
 print(f"Transformed X shape: {X_processed.shape}, expected features: {len(feature_names)}")
 
 # Save the full merged dataset with all original columns
 df.to_csv(os.path.join(data_dir, 'preprocessed_full_data.csv'), index=False)
+if PYARROW_AVAILABLE:
+    # Typed copy for train_xgb_model.py (keeps the int32/category dtypes, no re-parsing)
+    df.to_parquet(os.path.join(data_dir, 'preprocessed_full_data.parquet'), index=False)
 
 # Save the processed features and targets
 pd.DataFrame(X_processed, columns=feature_names).to_csv(
@@ -83,9 +101,15 @@ pd.DataFrame(y, columns=['maintenance_risk_score']).to_csv(
 
 # Save the preprocessor for later use
 joblib.dump(preprocessor, os.path.join('models', 'preprocessor.pkl'))
+# Export the fitted categories so maintenance_alerts.py can apply the one-hot lookup in plain NumPy
+np.savez(
+    os.path.join('models', 'preprocessor_params.npz'),
+    categories=preprocessor.named_transformers_['cat'].categories_[0].astype(str)
+)
 
 print('Preprocessing complete. Files saved:')
 print(f"- Full dataset: data/preprocessed_full_data.csv")
 print(f"- Processed features: data/preprocessed_features.csv")
 print(f"- Targets: data/preprocessed_targets.csv")
-print(f"- Preprocessor: models/preprocessor.pkl")
\ No newline at end of file
+print(f"- Preprocessor: models/preprocessor.pkl")
+print("- Transform parameters: models/preprocessor_params.npz")
\ No newline at end of file
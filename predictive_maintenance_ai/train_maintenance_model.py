@@ -1,8 +1,8 @@
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.preprocessing import OrdinalEncoder, StandardScaler
+from xgboost import XGBRegressor
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 import joblib
@@ -10,7 +10,15 @@ import os
 
 # Load data
 DATA_PATH = os.path.join(os.path.dirname(__file__), 'data', 'maintenance_model_inputs_outputs.csv')
-df = pd.read_csv(DATA_PATH)
+PARQUET_PATH = os.path.splitext(DATA_PATH)[0] + '.parquet'
+# Prefer the typed Parquet copy written by generate_maintenance_data_synced.py when it is current
+if os.path.exists(PARQUET_PATH) and (
+        not os.path.exists(DATA_PATH) or os.path.getmtime(PARQUET_PATH) >= os.path.getmtime(DATA_PATH)):
+    df = pd.read_parquet(PARQUET_PATH)
+    # Older copies stored address as text; match the numeric dtype the CSV reads back as
+    df['address'] = pd.to_numeric(df['address'])
+else:
+    df = pd.read_csv(DATA_PATH)
 
 # Features and target
 y = df['risk_score']
@@ -20,15 +28,25 @@ X = df[['address', 'age_years', 'last_service_years_ago', 'seasonality']]
 categorical = ['address', 'seasonality']
 numerical = ['age_years', 'last_service_years_ago']
 
+# address has ~3.5k distinct values, so it is ordinal-encoded and split on natively as a
+# categorical feature instead of being one-hot expanded into thousands of sparse columns.
+# Unseen categories become NaN, which XGBoost treats as missing.
 preprocessor = ColumnTransformer([
-    ('cat', OneHotEncoder(handle_unknown='ignore'), categorical),
+    ('cat', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=np.nan), categorical),
     ('num', StandardScaler(), numerical)
 ])
 
 # Model pipeline
 model = Pipeline([
     ('pre', preprocessor),
-    ('rf', RandomForestRegressor(n_estimators=100, random_state=42))
+    ('xgb', XGBRegressor(
+        objective='reg:squarederror',
+        tree_method='hist',
+        enable_categorical=True,
+        max_cat_to_onehot=1,
+        feature_types=['c'] * len(categorical) + ['q'] * len(numerical),
+        random_state=42
+    ))
 ])
 
 # Train/test split
@@ -42,6 +60,13 @@ score = model.score(X_test, y_test)
 pred_test = model.predict(X_test)
 print(f'R^2 on test set: {score:.3f}')
 
-# Save model and preprocessor
+# The chatbot sends the int code from address_map.json; make sure the fitted encoder maps a known code
+probe = X_train.iloc[[0]].assign(address=int(X_train['address'].iloc[0]))
+encoded = model.named_steps['pre'].transform(probe)
+assert encoded.shape == (1, len(categorical) + len(numerical)), encoded.shape
+assert encoded.dtype.kind == 'f', encoded.dtype
+assert not np.isnan(encoded[0, 0]), 'address code was not recognised by the fitted encoder'
+
+# Save model and preprocessor (file name kept for the chatbot's loader)
 joblib.dump(model, os.path.join(os.path.dirname(__file__), 'models', 'maintenance_rf_model.pkl'))
 print('Model saved to models/maintenance_rf_model.pkl')
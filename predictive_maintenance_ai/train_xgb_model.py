@@ -1,12 +1,20 @@
+import os
+import numpy as np
 import pandas as pd
 import joblib
 from sklearn.model_selection import train_test_split
 from xgboost import XGBRegressor
 from sklearn.metrics import mean_squared_error
 
-# Load preprocessed data
+# Load preprocessed data (the typed Parquet copy from preprocess_data.py when it is current)
+parquet_path = 'data/preprocessed_full_data.parquet'
+csv_path = 'data/preprocessed_full_data.csv'
 try:
-    df = pd.read_csv('data/preprocessed_full_data.csv')
+    if os.path.exists(parquet_path) and (
+            not os.path.exists(csv_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)):
+        df = pd.read_parquet(parquet_path)
+    else:
+        df = pd.read_csv(csv_path)
 except FileNotFoundError:
     print("Error: Please run data_preprocessing.py first to generate the data file")
     exit()
@@ -30,12 +38,13 @@ y = df[target_col]
 
 # Create preprocessor
 from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.preprocessing import OneHotEncoder
 
+# XGBoost splits on raw thresholds, so the numerics need no scaling and pass straight through
 preprocessor = ColumnTransformer(
     transformers=[
-        ('cat', OneHotEncoder(), ['construction_type']),
-        ('num', StandardScaler(), [col for col in feature_cols if col != 'construction_type'])
+        ('cat', OneHotEncoder(dtype=np.float32, sparse_output=False), ['construction_type']),
+        ('num', 'passthrough', [col for col in feature_cols if col != 'construction_type'])
     ],
     remainder='drop'
 )
@@ -48,8 +57,9 @@ X_train, X_test, y_train, y_test = train_test_split(
     X_processed, y, test_size=0.2, random_state=42
 )
 
-# Train model
-model = XGBRegressor(objective='reg:squarederror', random_state=42)
+# Train model (set XGB_DEVICE=cuda to build histograms on the GPU)
+device = os.getenv('XGB_DEVICE', 'cpu')
+model = XGBRegressor(objective='reg:squarederror', tree_method='hist', device=device, random_state=42)
 model.fit(X_train, y_train)
 
 # Evaluate
@@ -60,4 +70,22 @@ print(f"Model trained with MSE: {mse:.2f}")
 # Save model and preprocessor
 joblib.dump(preprocessor, 'models/preprocessor.pkl')
 joblib.dump(model, 'models/xgb_model.pkl')
-print("Model and preprocessor saved to models/ directory")
\ No newline at end of file
+print("Model and preprocessor saved to models/ directory")
+
+# Optional: compile the trees to a native library for fast inference in maintenance_alerts.py
+try:
+    import treelite
+    import tl2cgen
+except ImportError:
+    print("treelite/tl2cgen not installed, skipping compiled model export")
+    # A library compiled from an earlier model would otherwise be picked up by maintenance_alerts.py
+    if os.path.exists('models/xgb_model.so'):
+        os.remove('models/xgb_model.so')
+        print("Removed stale models/xgb_model.so")
+else:
+    tl_model = treelite.frontend.from_xgboost(model.get_booster())
+    tl2cgen.export_lib(
+        tl_model, toolchain='gcc', libpath='models/xgb_model.so',
+        params={'parallel_comp': 8}, verbose=False
+    )
+    print("Compiled model saved to models/xgb_model.so")
\ No newline at end of file
@@ -5,23 +5,32 @@ Test direct backend access to bypass Traefik routing issues.
 
 import requests
 import json
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from urllib3.util.connection import allowed_gai_family
+from api_test_utils import PIPELINED, PIPELINED_NOTICE, DIRECT_CHAT_URLS, dumps_json, install_dns_cache, loads_json, make_session
 
-def test_direct_backend():
-    """Test direct backend access."""
+# One pooled keep-alive session shared by every request in this script
+SESSION = make_session()
+
+def find_direct_backend(http_session, direct_urls=DIRECT_CHAT_URLS):
+    """Try direct backend access (if port 8000 is exposed); returns the first URL that answers, or None."""
     
-    # Try direct backend access (if port 8000 is exposed)
-    direct_urls = [
-        "https://srv889806.hstgr.cloud:8000/api/chat/",
-        "http://srv889806.hstgr.cloud:8000/api/chat/",
-    ]
+    # Warm the DNS cache with the same lookup urllib3 performs when it opens a connection
+    parsed = urlparse(direct_urls[0])
+    try:
+        socket.getaddrinfo(parsed.hostname, parsed.port, allowed_gai_family(), socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        print(f"DNS lookup failed for {parsed.hostname}: {e}")
     
     for url in direct_urls:
         print(f"\n🔗 Testing direct backend: {url}")
         
         try:
-            response = requests.post(
+            response = http_session.post(
                 url,
-                json={"message": "I need maintenance prediction for my property"},
+                data=dumps_json({"message": "I need maintenance prediction for my property"}),
                 headers={"Content-Type": "application/json"},
                 timeout=15,
                 verify=False  # Skip SSL verification for testing
@@ -30,7 +39,7 @@ def test_direct_backend():
             print(f"Status: {response.status_code}")
             
             if response.status_code == 200:
-                result = response.json()
+                result = loads_json(response.content)
                 print("✅ SUCCESS! Direct backend access works")
                 print(f"Response: {result.get('response', '')[:200]}...")
                 return url
@@ -44,11 +53,11 @@ def test_direct_backend():
     
     return None
 
-def test_maintenance_flow_direct(base_url):
-    """Test the full maintenance prediction flow using direct backend access."""
+def run_maintenance_flow_direct(http_session, chat_url):
+    """Run the full maintenance prediction flow using direct backend access; True if the server held up."""
     
     print(f"\n🧪 Testing Maintenance Prediction Flow")
-    print(f"Using: {base_url}")
+    print(f"Using: {chat_url}")
     print("=" * 60)
     
     conversation_history = []
@@ -59,6 +68,17 @@ def test_maintenance_flow_direct(base_url):
         "yes"
     ]
     
+    def post_turn(payload):
+        return http_session.post(
+            chat_url,
+            data=dumps_json(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=30,
+            verify=False
+        )
+    
+    in_flight = {}  # step number -> Future for turns already sent (--pipelined)
+    
     for i, message in enumerate(test_messages, 1):
         print(f"\n📩 Step {i}: {message}")
         
@@ -68,22 +88,32 @@ def test_maintenance_flow_direct(base_url):
                 "conversation_history": conversation_history
             }
             
-            response = requests.post(
-                base_url,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=30,
-                verify=False
-            )
+            if i in in_flight:
+                response = in_flight.pop(i).result()
+            else:
+                response = post_turn(payload)
             
             if response.status_code == 200:
-                result = response.json()
+                result = loads_json(response.content)
+                resp = result.get('response', '')
                 print(f"✅ Success - Action: {result.get('action')}")
-                print(f"Response: {result.get('response', '')[:200]}...")
+                print(f"Response: {resp[:200]}...")
                 
                 # Update conversation history
-                conversation_history.append({"role": "user", "content": message})
-                conversation_history.append({"role": "assistant", "content": result.get('response', '')})
+                conversation_history.extend([
+                    {"role": "user", "content": message},
+                    {"role": "assistant", "content": resp}
+                ])
+                
+                if PIPELINED and i == 1:
+                    print(PIPELINED_NOTICE)
+                    executor = ThreadPoolExecutor(max_workers=len(test_messages) - 1)
+                    for j, later in enumerate(test_messages[1:], 2):
+                        in_flight[j] = executor.submit(post_turn, {
+                            "message": later,
+                            "conversation_history": list(conversation_history)
+                        })
+                    executor.shutdown(wait=False)
                 
                 # Check if maintenance prediction completed
                 if result.get('action') == 'maintenance_prediction':
@@ -106,16 +136,23 @@ def test_maintenance_flow_direct(base_url):
     print("\n✅ All steps completed without crashes!")
     return True
 
+def test_direct_backend(http_session, direct_chat_url):
+    assert find_direct_backend(http_session, [direct_chat_url]) == direct_chat_url
+
+def test_maintenance_flow_direct(http_session, direct_chat_url):
+    assert run_maintenance_flow_direct(http_session, direct_chat_url)
+
 if __name__ == "__main__":
+    install_dns_cache()
     print("🚀 Direct Backend Testing")
     print("=" * 40)
     
     # Test direct backend access
-    working_url = test_direct_backend()
+    working_url = find_direct_backend(SESSION)
     
     if working_url:
         # Test the full maintenance flow
-        success = test_maintenance_flow_direct(working_url)
+        success = run_maintenance_flow_direct(SESSION, working_url)
         
         if success:
             print("\n🎉 TESTING COMPLETE - MAINTENANCE PREDICTION IS WORKING!")
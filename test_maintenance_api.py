@@ -5,12 +5,16 @@ Test script to simulate maintenance prediction calls via the API
 
 import requests
 import json
-import time
+from concurrent.futures import ThreadPoolExecutor
+from api_test_utils import PIPELINED, PIPELINED_NOTICE, APP_URL, dumps_json, install_dns_cache, loads_json, make_session
 
-def test_maintenance_prediction():
-    """Test the maintenance prediction API endpoint"""
-    
-    base_url = "https://rentmind.hstgr.cloud"
+# One pooled keep-alive session shared by every request in this script
+SESSION = make_session()
+
+BASE_URL = APP_URL
+
+def run_maintenance_prediction(http_session, base_url):
+    """Send the maintenance prediction conversation; True when every turn got a non-error reply."""
     
     # Test data for maintenance prediction
     test_messages = [
@@ -31,33 +35,48 @@ def test_maintenance_prediction():
     print("🔧 Testing Maintenance Prediction API...")
     print("=" * 50)
     
-    session = requests.Session()
+    def post_message(msg_data):
+        return http_session.post(
+            f"{base_url}/chat/",
+            data=dumps_json(msg_data),
+            headers={
+                "Content-Type": "application/json",
+                "User-Agent": "TestScript/1.0"
+            },
+            timeout=30
+        )
+    
+    in_flight = {}  # message number -> Future for messages already sent (--pipelined)
+    ok = False
     
     for i, msg_data in enumerate(test_messages, 1):
         print(f"\n--- Message {i} ---")
         print(f"Sending: {msg_data['message']}")
         
         try:
-            response = session.post(
-                f"{base_url}/chat/",
-                json=msg_data,
-                headers={
-                    "Content-Type": "application/json",
-                    "User-Agent": "TestScript/1.0"
-                },
-                timeout=30
-            )
+            if i in in_flight:
+                response = in_flight.pop(i).result()
+            else:
+                response = post_message(msg_data)
             
             print(f"Status: {response.status_code}")
             
             if response.status_code == 200:
-                result = response.json()
+                result = loads_json(response.content)
                 print(f"Response: {result.get('response', 'No response')[:200]}...")
                 print(f"Action: {result.get('action', 'Unknown')}")
                 
                 if 'error' in result.get('action', ''):
                     print("⚠️ Error detected in response!")
                     break
+                ok = i == len(test_messages)
+                
+                if PIPELINED and i == 1:
+                    print(PIPELINED_NOTICE)
+                    executor = ThreadPoolExecutor(max_workers=len(test_messages) - 1)
+                    for j, later in enumerate(test_messages[1:], 2):
+                        in_flight[j] = executor.submit(post_message, later)
+                    executor.shutdown(wait=False)
                     
             else:
                 print(f"Error: HTTP {response.status_code}")
@@ -73,12 +92,14 @@ def test_maintenance_prediction():
         except Exception as e:
             print(f"❌ Unexpected error: {e}")
             break
-            
-        # Wait between requests
-        time.sleep(2)
     
     print("\n" + "=" * 50)
     print("Test completed!")
+    return ok
+
+def test_maintenance_prediction(http_session, app_url):
+    assert run_maintenance_prediction(http_session, app_url)
 
 if __name__ == "__main__":
-    test_maintenance_prediction()
+    install_dns_cache()
+    run_maintenance_prediction(SESSION, BASE_URL)
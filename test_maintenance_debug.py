@@ -5,22 +5,44 @@ Debug script to test maintenance prediction locally
 
 import os
 import sys
+import glob
+import pickle
+import hashlib
 import traceback
+from functools import lru_cache
+from itertools import islice
 
 # Add the AI Assistant directory to path so we can import modules
 sys.path.append(os.path.join(os.path.dirname(__file__), 'AI Assistant'))
 
+@lru_cache(maxsize=1)
+def _shared_handler():
+    """One handler (and the model/address map it loads) shared by both tests; they only read from it."""
+    from chatbot_integration import MaintenancePredictionHandler
+    return MaintenancePredictionHandler()
+
+# Conversation replayed by test_conversation_flow. After each turn the state is pickled, so
+# `--resume` can skip straight to the last unfinished turn; `--invalidate` clears the checkpoints.
+# File names include a hash of the messages, so editing a message never resumes stale state.
+CONVERSATION_MESSAGES = [
+    "I need maintenance prediction for my property",  # 1: Initial request
+    "Holland Road property, 50 years old, last service 5 years ago, winter season",  # 2: Provide details
+    "yes"  # 3: Confirmation
+]
+CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.debug_checkpoints')
+_CHECKPOINT_KEY = hashlib.sha1("\n".join(CONVERSATION_MESSAGES).encode('utf-8')).hexdigest()[:12]
+
+def _checkpoint_path(step):
+    return os.path.join(CHECKPOINT_DIR, f"conversation_{_CHECKPOINT_KEY}_{step}.pkl")
+
 def test_maintenance_model():
     """Test the maintenance prediction model directly"""
     print("🔧 Testing Maintenance Prediction Model...")
     print("=" * 50)
     
     try:
-        # Import the handler
-        from chatbot_integration import MaintenancePredictionHandler
-        
-        # Create handler instance
-        handler = MaintenancePredictionHandler()
+        # Import and create the shared handler instance
+        handler = _shared_handler()
         print("✅ Handler created successfully")
         
         # Test model loading
@@ -38,7 +60,7 @@ def test_maintenance_model():
             address_map = handler.get_address_map()
             print("✅ Address map loaded successfully")
             print(f"   Address map size: {len(address_map)} entries")
-            print(f"   Sample addresses: {list(address_map.keys())[:5]}")
+            print(f"   Sample addresses: {list(islice(address_map, 5))}")
         except Exception as e:
             print(f"❌ Address map loading failed: {e}")
             traceback.print_exc()
@@ -80,41 +102,48 @@ def test_conversation_flow():
     print("\n🗣️ Testing Conversation Flow...")
     print("=" * 50)
     
+    if "--invalidate" in sys.argv:
+        for path in glob.glob(os.path.join(CHECKPOINT_DIR, "conversation_*.pkl")):
+            os.remove(path)
+        print("🧹 Conversation checkpoints cleared")
+    
     try:
-        from chatbot_integration import MaintenancePredictionHandler
-        
-        handler = MaintenancePredictionHandler()
+        handler = _shared_handler()
         conversation_history = []
+        result = {'fields': {}}
+        first_step = 1
+        
+        # Resume from the latest checkpoint before the final turn
+        if "--resume" in sys.argv:
+            for step in range(len(CONVERSATION_MESSAGES) - 1, 0, -1):
+                if os.path.exists(_checkpoint_path(step)):
+                    with open(_checkpoint_path(step), 'rb') as f:
+                        conversation_history, result = pickle.load(f)
+                    first_step = step + 1
+                    print(f"⏩ Resumed after message {step} from checkpoint")
+                    break
+        
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        for step, message in enumerate(CONVERSATION_MESSAGES[first_step - 1:], first_step):
+            result = handler.handle(conversation_history, message, result['fields'])
+            print(f"✅ Message {step} handled: {result['action']}")
+            if 1 < step < len(CONVERSATION_MESSAGES):
+                print(f"   Fields collected: {list(result['fields'].keys())}")
+            
+            # Update conversation history
+            conversation_history.extend([
+                {"role": "user", "content": message},
+                {"role": "assistant", "content": result['response']}
+            ])
+            
+            with open(_checkpoint_path(step), 'wb') as f:
+                pickle.dump((conversation_history, result), f)
         
-        # Test message 1: Initial request
-        msg1 = "I need maintenance prediction for my property"
-        result1 = handler.handle(conversation_history, msg1, {})
-        print(f"✅ Message 1 handled: {result1['action']}")
-        
-        # Update conversation history
-        conversation_history.append({"role": "user", "content": msg1})
-        conversation_history.append({"role": "assistant", "content": result1['response']})
-        
-        # Test message 2: Provide details
-        msg2 = "Holland Road property, 50 years old, last service 5 years ago, winter season"
-        result2 = handler.handle(conversation_history, msg2, result1['fields'])
-        print(f"✅ Message 2 handled: {result2['action']}")
-        print(f"   Fields collected: {list(result2['fields'].keys())}")
-        
-        # Update conversation history
-        conversation_history.append({"role": "user", "content": msg2})
-        conversation_history.append({"role": "assistant", "content": result2['response']})
-        
-        # Test message 3: Confirmation
-        msg3 = "yes"
-        result3 = handler.handle(conversation_history, msg3, result2['fields'])
-        print(f"✅ Message 3 handled: {result3['action']}")
-        
-        if result3['action'] == 'maintenance_prediction':
+        if result['action'] == 'maintenance_prediction':
             print("✅ Full conversation flow successful!")
-            print(f"Final result preview: {result3['response'][:200]}...")
+            print(f"Final result preview: {result['response'][:200]}...")
         else:
-            print(f"⚠️ Expected maintenance_prediction action, got: {result3['action']}")
+            print(f"⚠️ Expected maintenance_prediction action, got: {result['action']}")
             
     except Exception as e:
         print(f"❌ Conversation flow test failed: {e}")
@@ -6,11 +6,12 @@ import sys
 # Add the AI Assistant directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'AI Assistant'))
 
-from chatbot_integration import MaintenancePredictionHandler
-
 def test_maintenance_prediction():
     print("Testing Enhanced Maintenance Prediction Handler...")
     
+    # Imported here: chatbot_integration pulls in LangChain, pandas, xgboost, etc.
+    from chatbot_integration import MaintenancePredictionHandler
+    
     # Initialize handler
     handler = MaintenancePredictionHandler()
     
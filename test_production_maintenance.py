@@ -7,16 +7,85 @@ Tests the exact flow that was causing disconnections.
 import requests
 import json
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from api_test_utils import PIPELINED, PIPELINED_NOTICE, PRODUCTION_URL, dumps_json, install_dns_cache, loads_json, make_session
+
+# One pooled keep-alive session shared by every request in this script
+SESSION = make_session()
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+
+class _Breaker:
+    """
+    Client-side circuit breaker: CLOSED -> OPEN after `threshold` consecutive failures (connection
+    errors, timeouts or 5xx), HALF_OPEN once `reset_after` seconds have passed, and back to CLOSED on
+    the next 2xx. While OPEN, calls fail fast instead of adding load to a struggling server.
+    State changes are locked so --pipelined turns can share one breaker; requests are sent unlocked.
+    """
+    CLOSED, OPEN, HALF_OPEN = "CLOSED", "OPEN", "HALF_OPEN"
+
+    def __init__(self, threshold=3, reset_after=30):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.state = self.CLOSED
+        self.failures = 0
+        self.last_failure_ts = 0.0
+        self._lock = threading.Lock()
+
+    def call(self, send):
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.last_failure_ts < self.reset_after:
+                    print("⚡ Circuit open - fast-failing")
+                    raise CircuitOpenError(f"{self.failures} consecutive failures")
+                self.state = self.HALF_OPEN
+        try:
+            response = send()
+        except requests.exceptions.RequestException:
+            self._record_failure()
+            raise
+        if response.status_code >= 500:
+            self._record_failure()
+        elif 200 <= response.status_code < 300:
+            with self._lock:
+                self.state = self.CLOSED
+                self.failures = 0
+        return response
+
+    def _record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.last_failure_ts = time.monotonic()
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                self.state = self.OPEN
+
+
+BREAKER = _Breaker()
 
 # Production server URL
-BASE_URL = "https://srv889806.hstgr.cloud"
-CHAT_ENDPOINT = f"{BASE_URL}/api/chat/"
+BASE_URL = PRODUCTION_URL
+
+def post_chat(http_session, chat_endpoint, payload):
+    """POST one chat turn through the circuit breaker."""
+    return BREAKER.call(lambda: http_session.post(
+        chat_endpoint,
+        data=dumps_json(payload),
+        headers={"Content-Type": "application/json"},
+        timeout=30  # 30 second timeout
+    ))
 
-def test_maintenance_prediction_flow():
-    """Test the complete maintenance prediction flow that was causing crashes."""
+def run_maintenance_prediction_flow(http_session, base_url):
+    """
+    Run the complete maintenance prediction flow that was causing crashes. True when the server
+    answered every turn, or finished early with a prediction or a graceful error action.
+    """
+    chat_endpoint = f"{base_url}/api/chat/"
     
     print("🔍 Testing Maintenance Prediction Flow on Production Server")
-    print(f"Server: {BASE_URL}")
+    print(f"Server: {base_url}")
     print("=" * 60)
     
     # Test data that mimics the user's typical input
@@ -36,8 +105,10 @@ def test_maintenance_prediction_flow():
     ]
     
     conversation_history = []
+    in_flight = {}  # step number -> Future for turns already sent (--pipelined)
     
     for i, test in enumerate(test_messages, 1):
+        ok = False  # set once this turn's reply has been parsed
         print(f"\n{test['step']}")
         print(f"Message: '{test['message']}'")
         print("-" * 40)
@@ -49,21 +120,19 @@ def test_maintenance_prediction_flow():
                 "conversation_history": conversation_history
             }
             
-            print(f"Sending request to {CHAT_ENDPOINT}")
-            
-            # Send request with timeout
-            response = requests.post(
-                CHAT_ENDPOINT,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=30  # 30 second timeout
-            )
+            # Send request with timeout (or collect the pipelined one)
+            if i in in_flight:
+                print(f"Collecting pipelined response from {chat_endpoint}")
+                response = in_flight.pop(i).result()
+            else:
+                print(f"Sending request to {chat_endpoint}")
+                response = post_chat(http_session, chat_endpoint, payload)
             
             print(f"Response Status: {response.status_code}")
             
             if response.status_code == 200:
                 try:
-                    result = response.json()
+                    result = loads_json(response.content)
                     
                     # Display response details
                     print(f"✅ SUCCESS - Step {i} completed")
@@ -72,15 +141,22 @@ def test_maintenance_prediction_flow():
                     print(f"Fields: {result.get('fields', {})}")
                     
                     # Update conversation history
-                    conversation_history.append({
-                        "role": "user",
-                        "content": test["message"]
-                    })
-                    conversation_history.append({
-                        "role": "assistant", 
-                        "content": result.get('response', '')
-                    })
+                    conversation_history.extend([
+                        {"role": "user", "content": test["message"]},
+                        {"role": "assistant", "content": result.get('response', '')}
+                    ])
+                    
+                    if PIPELINED and i == 1:
+                        print(PIPELINED_NOTICE)
+                        executor = ThreadPoolExecutor(max_workers=len(test_messages) - 1)
+                        for j, later in enumerate(test_messages[1:], 2):
+                            in_flight[j] = executor.submit(post_chat, http_session, chat_endpoint, {
+                                "message": later["message"],
+                                "conversation_history": list(conversation_history)
+                            })
+                        executor.shutdown(wait=False)
                     
+                    ok = True
                     # Check if this was the maintenance prediction result
                     if result.get('action') == 'maintenance_prediction':
                         print("🎉 MAINTENANCE PREDICTION COMPLETED SUCCESSFULLY!")
@@ -100,6 +176,9 @@ def test_maintenance_prediction_flow():
                 print(f"Response: {response.text[:500]}")
                 break
                 
+        except CircuitOpenError as e:
+            print(f"❌ Circuit open ({e}), not sending")
+            break
         except requests.exceptions.ConnectionError as e:
             print(f"❌ Connection Error: {e}")
             print("Server may have crashed or is not responding")
@@ -111,24 +190,22 @@ def test_maintenance_prediction_flow():
         except Exception as e:
             print(f"❌ Unexpected Error: {e}")
             break
-        
-        # Small delay between requests
-        time.sleep(1)
     
     print("\n" + "=" * 60)
     print("Test Complete")
+    return ok
 
-def test_server_health():
-    """Test if the server is responsive."""
+def check_server_health(http_session, base_url):
+    """True if the server is responsive."""
     print("🏥 Testing Server Health")
     print("-" * 30)
     
     try:
-        # Test the main page
-        response = requests.get(BASE_URL, timeout=10)
+        # Test the main page (HEAD: status only, no body transferred; some servers answer 405)
+        response = http_session.head(base_url, timeout=10, allow_redirects=True)
         print(f"Main page status: {response.status_code}")
         
-        if response.status_code == 200:
+        if response.status_code in (200, 301, 302, 405):
             print("✅ Server is responsive")
             return True
         else:
@@ -139,15 +216,22 @@ def test_server_health():
         print(f"❌ Server health check failed: {e}")
         return False
 
+def test_server_health(http_session, base_url):
+    assert check_server_health(http_session, base_url)
+
+def test_maintenance_prediction_flow(http_session, base_url):
+    assert run_maintenance_prediction_flow(http_session, base_url)
+
 if __name__ == "__main__":
+    install_dns_cache()
     print("🚀 Production Maintenance Prediction Test")
     print(f"Testing server: {BASE_URL}")
     print(f"Time: {time.strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
     
     # First check server health
-    if test_server_health():
+    if check_server_health(SESSION, BASE_URL):
         print("\n")
-        test_maintenance_prediction_flow()
+        run_maintenance_prediction_flow(SESSION, BASE_URL)
     else:
         print("❌ Skipping API tests due to server issues")